@@ -0,0 +1,12 @@
+"""
+    benchmarks
+    ~~~~~~~~~~
+
+    Benchmarks of cuetoolkit hot paths on synthetic cuesheets and tracks.
+    Run them from the source tree:
+
+        python3 -m benchmarks [-s SIZES] [-r REPEAT] [-k PATTERN]
+                              [-o BASELINE] [-c BASELINE]
+
+    benchmarks.importtime measures the startup of cuetoolkit commands.
+"""
@@ -0,0 +1,110 @@
+"""
+    benchmarks.__main__
+    ~~~~~~~~~~~~~~~~~~~
+
+    Run the benchmarks, print their statistics, save them as a baseline
+    or compare them with a baseline saved before.
+"""
+
+
+import argparse
+import fnmatch
+import shutil
+import sys
+import tempfile
+
+from . import timing
+from .stages import gen_cases
+
+
+def parse_args():
+    args = argparse.ArgumentParser(prog='python3 -m benchmarks')
+    args.add_argument(
+        '-s',
+        action='store',
+        dest='sizes',
+        default='10,100,1000,5000',
+        help='comma separated numbers of tracks of synthetic cuesheets, \
+default is 10,100,1000,5000')
+    args.add_argument(
+        '-r',
+        action='store',
+        dest='repeat',
+        type=int,
+        default=7,
+        help='the number of samples of every case, default is 7')
+    args.add_argument(
+        '-k',
+        action='store',
+        dest='pattern',
+        default='*',
+        help='run only cases matching the shell PATTERN, e.g. "points/*"')
+    args.add_argument(
+        '-o',
+        action='store',
+        dest='output',
+        default=None,
+        help='save the results as a JSON baseline')
+    args.add_argument(
+        '-c',
+        action='store',
+        dest='baseline',
+        default=None,
+        help='compare the results with a JSON baseline, the exit status \
+is 1 if any case is slower')
+    args.add_argument(
+        '-t',
+        action='store',
+        dest='threshold',
+        type=float,
+        default=0.1,
+        help='the relative change of a minimum taken as a real one, \
+default is 0.1')
+    return args.parse_args()
+
+
+def run(args):
+    sizes = [int(each) for each in args.sizes.split(',')]
+    home = tempfile.mkdtemp(prefix='cuetoolkit-bench-')
+    results = dict()
+    try:
+        for name, func, setup in gen_cases(home, sizes):
+            if not fnmatch.fnmatchcase(name, args.pattern):
+                continue
+            stats = timing.measure(func, setup, args.repeat)
+            results[name] = stats
+            print('{0:<36}{1:>12}{2:>12}{3:>8.1%}'.format(
+                name,
+                timing.format_time(stats['median']),
+                timing.format_time(stats['min']),
+                stats['stdev'] / stats['mean'] if stats['mean'] else 0))
+            sys.stdout.flush()
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+    return results
+
+
+def main():
+    args = parse_args()
+    print('{0:<36}{1:>12}{2:>12}{3:>8}'.format(
+        'case', 'median', 'min', 'stdev'))
+    results = run(args)
+    if args.output:
+        timing.save(args.output, results)
+    if args.baseline is None:
+        return 0
+    baseline = timing.load(args.baseline)
+    print('\ncompared with cuetoolkit-{0}, python {1}, {2}'.format(
+        baseline['version'], baseline['python'], baseline['created']))
+    slower = 0
+    for case, old, new, ratio, verdict in timing.compare(
+            results, baseline['results'], args.threshold):
+        print('{0:<36}{1:>12}{2:>12}{3:>8.2f}x  {4}'.format(
+            case, timing.format_time(old), timing.format_time(new),
+            ratio, verdict))
+        slower += verdict == 'slower'
+    return 1 if slower else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
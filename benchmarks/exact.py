@@ -0,0 +1,120 @@
+"""
+    benchmarks.exact
+    ~~~~~~~~~~~~~~~~
+
+    Check that tracks decoded by seeking, the -k option of cue2tracks, are
+    sample identical to tracks cut by mmap and by shnsplit. A synthetic
+    image is split in every way with every schema and the md5 hashes of
+    the PCM data of the tracks are compared. flac is required, shnsplit
+    is used if it is installed.
+"""
+
+
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+
+from subprocess import DEVNULL, PIPE, Popen, check_call
+
+from cuetoolkit.abstract import WaveData
+from cuetoolkit.converter.convert import CDDAConverter
+from cuetoolkit.deps import registry
+
+from .synth import write_sheet, write_wave
+
+
+def parse_args():
+    args = argparse.ArgumentParser(prog='python3 -m benchmarks.exact')
+    args.add_argument(
+        '-n',
+        action='store',
+        dest='tracks',
+        type=int,
+        default=7,
+        help='the number of tracks of the synthetic image, default is 7')
+    args.add_argument(
+        '-l',
+        action='store',
+        dest='length',
+        type=int,
+        default=75 * 60 + 37,
+        help='the image length in CD frames, default is 4537')
+    return args.parse_args()
+
+
+def count_pcm_hash(name):
+    """
+    Decode the FLAC file 'name' and count md5 of its PCM data.
+    :param name: string (file name)
+    :return: string (hex digest)
+    """
+    cmd = [registry.locate('flac'), '-d', '-s', '-c', name]
+    with Popen(cmd, stdout=PIPE, stderr=DEVNULL) as p:
+        WaveData.read_wave_header(p.stdout)
+        md5 = hashlib.md5()
+        for chunk in iter(lambda: p.stdout.read(WaveData.chunk), b''):
+            md5.update(chunk)
+    if p.returncode:
+        raise RuntimeError('{} cannot be decoded'.format(name))
+    return md5.hexdigest()
+
+
+def split(cue, output, schema, jobs, seek):
+    """
+    Split the image of 'cue' to FLAC tracks.
+    :return: list of md5 hashes of the PCM data of the tracks
+    """
+    image = CDDAConverter('flac', schema, True, output=output)
+    image.check_data(cue, None)
+    image.convert(False, jobs, seek)
+    return [count_pcm_hash(os.path.join(output, name))
+            for name in sorted(os.listdir(output))
+            if name.endswith('.flac')]
+
+
+def check(home, tracks, length):
+    """
+    Split the synthetic image in every way and compare the tracks.
+    :return: the number of mismatches
+    """
+    for kind, media in (('wave', 'image.wav'), ('flac', 'image.flac')):
+        os.mkdir(os.path.join(home, kind))
+        write_sheet(os.path.join(home, kind, 'image.cue'), tracks, 'utf-8',
+                    True, length=length, media=media)
+    wave = os.path.join(home, 'wave', 'image.wav')
+    write_wave(wave, length)
+    check_call([registry.locate('flac'), '-s', '-o',
+                os.path.join(home, 'flac', 'image.flac'), wave])
+    ways = [('mmap', 'wave', 1, False), ('seek', 'flac', 2, True)]
+    if registry.resolve('shnsplit'):
+        ways.append(('shnsplit', 'flac', None, False))
+    mismatches = 0
+    for schema in ('append', 'prepend', 'split'):
+        results = [(way, split(
+            os.path.join(home, kind, 'image.cue'),
+            os.path.join(home, '{0}-{1}'.format(schema, way)),
+            schema, jobs, seek)) for way, kind, jobs, seek in ways]
+        reference, hashes = results[0]
+        for way, other in results[1:]:
+            same = other == hashes
+            mismatches += not same
+            print('{0:<10}{1:<10}{2} tracks, {3}'.format(
+                schema, way, len(other),
+                'identical to ' + reference if same else 'DIFFERENT'))
+    return mismatches
+
+
+def main():
+    args = parse_args()
+    home = tempfile.mkdtemp(prefix='cuetoolkit-exact-')
+    try:
+        return 1 if check(home, args.tracks, args.length) else 0
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
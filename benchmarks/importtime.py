@@ -0,0 +1,121 @@
+"""
+    benchmarks.importtime
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Measure the startup of every cuetoolkit command with python -X importtime
+    (Python 3.7 or later): the wall time of 'cuetoolkit COMMAND -h', the
+    import time of cuetoolkit and the heavy modules it loaded. The commands
+    run with an empty HOME, every file written there is a side effect of
+    importing. Run it from the source tree:
+
+        python3 benchmarks/importtime.py [-n RUNS] [-t TOP]
+"""
+
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+commands = ('points', 'report', 'copy', 'cue',
+            'tags', 'tracks', 'daemon', 'job')
+heavy = ('chardet', 'mutagen', 'subprocess', 'json', 'asyncio')
+
+
+def parse_importtime(output):
+    """
+    Parse the report of -X importtime.
+    :param output: string, stderr of the process
+    :return: list of tuples (module, self us, cumulative us, level)
+    """
+    modules = list()
+    for line in output.splitlines():
+        if not line.startswith('import time:') or '[us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), int(own), int(cumulative), level))
+    return modules
+
+
+def measure(command, runs):
+    """
+    Start 'cuetoolkit COMMAND -h' 'runs' times.
+    :param command: string
+    :param runs: integer
+    :return: tuple (list of wall times in seconds, modules of the last run,
+             files written in HOME)
+    """
+    home = tempfile.mkdtemp(prefix='cuetoolkit-bench-')
+    env = dict(os.environ, HOME=home)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [root] + ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+    cmd = [sys.executable, '-X', 'importtime',
+           os.path.join(root, 'bin', 'cuetoolkit'), command, '-h']
+    walls, modules = list(), None
+    try:
+        for _ in range(runs):
+            start = time.perf_counter()
+            p = subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE,
+                               universal_newlines=True)
+            walls.append(time.perf_counter() - start)
+            modules = parse_importtime(p.stderr)
+        written = [os.path.relpath(os.path.join(home_dir, name), home)
+                   for home_dir, _, files in os.walk(home)
+                   for name in files]
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+    return walls, modules, written
+
+
+def parse_args():
+    args = argparse.ArgumentParser()
+    args.add_argument(
+        '-n',
+        action='store',
+        dest='runs',
+        type=int,
+        default=10,
+        help='the number of runs of every command, default is 10')
+    args.add_argument(
+        '-t',
+        action='store',
+        dest='top',
+        type=int,
+        default=0,
+        help='show TOP slowest cuetoolkit modules of every command')
+    return args.parse_args()
+
+
+def main():
+    args = parse_args()
+    print('{0:<8}{1:>10}{2:>10}{3:>12}  {4}'.format(
+        'command', 'wall ms', 'min ms', 'import ms', 'heavy modules'))
+    side_effects = dict()
+    for command in commands:
+        walls, modules, written = measure(command, args.runs)
+        loaded = set(name.split('.')[0] for name, _, _, _ in modules)
+        own = [each for each in modules if each[0].startswith('cuetoolkit')]
+        print('{0:<8}{1:>10.1f}{2:>10.1f}{3:>12.1f}  {4}'.format(
+            command,
+            statistics.median(walls) * 1000,
+            min(walls) * 1000,
+            sum(c for _, _, c, level in modules if level == 0) / 1000,
+            ' '.join(name for name in heavy if name in loaded) or '-'))
+        for name, _, cumulative, _ in sorted(
+                own, key=lambda each: -each[2])[:args.top]:
+            print('{0:<8}{1:>32.1f}  {2}'.format('', cumulative / 1000, name))
+        if written:
+            side_effects[command] = written
+    for command, written in sorted(side_effects.items()):
+        print('{0} wrote {1} at startup'.format(command, ', '.join(written)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+    benchmarks.stages
+    ~~~~~~~~~~~~~~~~~
+
+    The benchmarked stages of cuetoolkit: parsing cuesheets, extracting
+    indices, sifting points, counting durations, renaming and tagging
+    tracks. Every stage gets its synthetic data in the 'home' directory.
+"""
+
+
+import os
+
+from cuetoolkit.abstract import Rename
+from cuetoolkit.common import CDDAPoints, Cue
+from cuetoolkit.model import Disc
+from cuetoolkit.mutagen.tagger import Tagger
+from cuetoolkit.report import Reporter
+from cuetoolkit.timeline import Frames
+
+from .synth import encodings, gen_sheet, limit, write_sheet, writers
+
+
+def _extract_cases(home, sizes):
+    for tracks in sizes:
+        for encoding in encodings:
+            for pregaps in (False, True):
+                name = os.path.join(home, 'sheet-{0}-{1}-{2:d}.cue'.format(
+                    tracks, encoding, pregaps))
+                write_sheet(name, tracks, encoding, pregaps)
+                yield ('extract/{0}/{1}/{2}'.format(
+                    tracks, encoding, 'pregaps' if pregaps else 'plain'),
+                    # parsing is measured, not the cache of parsed
+                    # cuesheets
+                    lambda name=name: Cue(use_cache=False).extract(name),
+                    None)
+
+
+def _points_cases(sizes):
+    for tracks in sizes:
+        for pregaps in (False, True):
+            points = CDDAPoints()
+            sheet = points._parse(gen_sheet(tracks, pregaps))
+            gaps = 'pregaps' if pregaps else 'plain'
+            yield ('indices/{0}/{1}'.format(tracks, gaps),
+                   lambda p=points, s=sheet.store: p._extract_indices(s),
+                   None)
+            points.store = points._arrange_indices(sheet.store)
+            for schema in ('append', 'prepend', 'split'):
+                yield ('points/{0}/{1}/{2}'.format(tracks, gaps, schema),
+                       lambda p=points, s=schema: p.sift_points(s), None)
+            if not pregaps:
+                split = points.sift_points('append')
+                yield ('durations/{}'.format(tracks),
+                       lambda r=Reporter(), s=split: r._count_durations(
+                           Frames(limit), s), None)
+
+
+def _disc(tracks):
+    cue = Cue()
+    sheet = cue._parse(gen_sheet(tracks))
+    cue._validate_metadata(sheet.meta)
+    return Disc.from_sheet(sheet.meta, sheet.store)
+
+
+def _rename_cases(home, sizes):
+    for tracks in sizes:
+        directory = os.path.join(home, 'rename-{}'.format(tracks))
+        os.mkdir(directory)
+        disc = _disc(tracks)
+        names = [os.path.join(directory, 'track{:02d}.flac'.format(step))
+                 for step in range(tracks)]
+        for name in names:
+            open(name, 'wb').close()
+        renamed = list(names)
+
+        def setup(names=names, renamed=renamed):
+            # the tracks get their original names back before every run
+            for step, name in enumerate(names):
+                if renamed[step] != name:
+                    os.rename(renamed[step], name)
+                    renamed[step] = name
+            return ()
+
+        def run(names=names, renamed=renamed, disc=disc):
+            for step, name in enumerate(names):
+                renamed[step] = Rename.rename_file(name, step, disc) or name
+        yield 'rename/{}'.format(tracks), run, setup
+
+
+def _tag_cases(home, tracks=10):
+    disc = _disc(tracks)
+    for media_type in sorted(writers):
+        names = list()
+        for step in range(tracks):
+            name = os.path.join(home, 'tag{0:02d}.{1}'.format(
+                step, media_type))
+            writers[media_type](name)
+            names.append(name)
+        tagger = Tagger()
+        tagger.prepare(media_type)
+
+        def run(tagger=tagger, names=names):
+            for step, name in enumerate(names):
+                if tagger.write_meta(name, step, disc) is None:
+                    raise RuntimeError('{} cannot be tagged'.format(name))
+        yield 'tag/{0}/{1}'.format(media_type, tracks), run, None
+
+
+def gen_cases(home, sizes):
+    """
+    Generate the benchmark cases and their data.
+    :param home: string, an empty directory for the data
+    :param sizes: list of integers, the numbers of tracks
+    :return: iterator of tuples (name, function, setup or None)
+    """
+    yield from _extract_cases(home, sizes)
+    yield from _points_cases(sizes)
+    yield from _rename_cases(home, sizes)
+    yield from _tag_cases(home)
@@ -0,0 +1,153 @@
+"""
+    benchmarks.synth
+    ~~~~~~~~~~~~~~~~
+
+    Synthetic test data: cuesheets of any number of tracks in several
+    encodings, with and without pregaps, CDDA WAVE images, and tiny FLAC,
+    Ogg Vorbis and MP3 files which mutagen can read and tag. Nothing has
+    to be encoded.
+"""
+
+
+import random
+import struct
+
+# cp1251 is detected by chardet, the others by their BOMs or as UTF-8
+encodings = ('utf-8', 'utf-8-sig', 'utf-16', 'cp1251')
+# the longest time a cuesheet index can keep, 99:59:74
+limit = (99 * 60 + 59) * 75 + 74
+
+
+def format_index(frames):
+    """
+    Format CD frames as a cuesheet index.
+    :param frames: integer
+    :return: string in format "mm:ss:ff"
+    """
+    return '{0:02d}:{1:02d}:{2:02d}'.format(
+        frames // 4500, frames // 75 % 60, frames % 75)
+
+
+def gen_sheet(tracks, pregaps=False, length=limit, media='image.wav'):
+    """
+    Generate a cuesheet of an image of 'tracks' tracks, the tracks share
+    the image evenly.
+    :param tracks: integer
+    :param pregaps: True to give every track but the first one a pregap
+    :param length: integer, the image length in CD frames, the longest
+                   possible image by default
+    :param media: string, the file name of the image
+    :return: list containing strings
+    """
+    step = length // (tracks + 1)
+    gap = min(150, step // 4)
+    lines = ['REM GENRE "Классика"',
+             'REM DATE 1999',
+             'REM DISCID 8A0B7C0D',
+             'REM COMMENT "synthetic"',
+             'PERFORMER "Оркестр"',
+             'TITLE "Синтетический альбом"',
+             'FILE "{}" WAVE'.format(media)]
+    for number in range(1, tracks + 1):
+        start = (number - 1) * step
+        lines.append('  TRACK {0:02d} AUDIO'.format(number))
+        lines.append('    TITLE "Часть {0}"'.format(number))
+        lines.append('    PERFORMER "Исполнитель {0}"'.format(number % 7))
+        if pregaps and number > 1:
+            lines.append('    INDEX 00 {}'.format(
+                format_index(start - gap)))
+        lines.append('    INDEX 01 {}'.format(format_index(start)))
+    return lines
+
+
+def write_sheet(name, tracks, encoding, pregaps=False, **kwargs):
+    """
+    Write a synthetic cuesheet to the file 'name'.
+    :param name: string (file name)
+    :param tracks: integer
+    :param encoding: one of 'encodings'
+    :param pregaps: True or False
+    :param kwargs: 'length' and 'media', see gen_sheet
+    :return: None
+    """
+    with open(name, 'w', encoding=encoding, newline='\r\n') as f:
+        for line in gen_sheet(tracks, pregaps, **kwargs):
+            print(line, file=f)
+
+
+def write_wave(name, frames, seed=1):
+    """
+    Write a CDDA WAVE image of noise, every sample differs from its
+    neighbours, so a track cut one sample off has another checksum.
+    :param name: string (file name)
+    :param frames: integer, the image length in CD frames
+    :param seed: integer
+    :return: None
+    """
+    size = frames * 2352
+    header = b'RIFF' + struct.pack('<I', 36 + size) + b'WAVEfmt ' + \
+        struct.pack('<IHHIIHH', 16, 1, 2, 44100, 176400, 4, 16) + \
+        b'data' + struct.pack('<I', size)
+    noise = random.Random(seed)
+    with open(name, 'wb') as f:
+        f.write(header)
+        for _ in range(frames):
+            f.write(noise.getrandbits(2352 * 8).to_bytes(2352, 'little'))
+
+
+def write_flac(name):
+    """
+    Write a FLAC file of one second, its only frame is empty.
+    :param name: string (file name)
+    :return: None
+    """
+    # rate (20 bits), channels - 1 (3), bits - 1 (5), samples (36)
+    packed = (44100 << 44) | (1 << 41) | (15 << 36) | 44100
+    info = struct.pack('>HH', 4096, 4096) + bytes(6) + \
+        packed.to_bytes(8, 'big') + bytes(16)
+    with open(name, 'wb') as f:
+        # the last metadata block, STREAMINFO
+        f.write(b'fLaC' + bytes([0x80]) + len(info).to_bytes(3, 'big'))
+        f.write(info + b'\xff\xf8' + bytes(64))
+
+
+def write_ogg(name):
+    """
+    Write an Ogg Vorbis file of one second without audio packets.
+    :param name: string (file name)
+    :return: None
+    """
+    from mutagen.ogg import OggPage
+    ident = b'\x01vorbis' + struct.pack(
+        '<IBIiiiB', 0, 2, 44100, 0, 128000, 0, 0xb8) + b'\x01'
+    comment = b'\x03vorbis' + struct.pack('<I', 5) + b'synth' + \
+        struct.pack('<I', 0) + b'\x01'
+    setup = b'\x05vorbis' + bytes(32)
+    pages = list()
+    for sequence, packets in enumerate(
+            ([ident], [comment, setup], [bytes(64)])):
+        page = OggPage()
+        page.packets = packets
+        page.serial = 1
+        page.sequence = sequence
+        page.position = 44100 if sequence == 2 else 0
+        page.first = sequence == 0
+        page.last = sequence == 2
+        pages.append(page.write())
+    with open(name, 'wb') as f:
+        f.write(b''.join(pages))
+
+
+def write_mp3(name):
+    """
+    Write an MP3 file of about one second of silent frames.
+    :param name: string (file name)
+    :return: None
+    """
+    # MPEG-1 Layer III, 128 kbps, 44100 Hz, 417 bytes per frame
+    frame = b'\xff\xfb\x90\x64' + bytes(413)
+    with open(name, 'wb') as f:
+        f.write(frame * 40)
+
+
+writers = {'flac': write_flac, 'ogg': write_ogg, 'mp3': write_mp3}
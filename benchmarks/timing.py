@@ -0,0 +1,124 @@
+"""
+    benchmarks.timing
+    ~~~~~~~~~~~~~~~~~
+
+    Time benchmark cases, keep their statistics in JSON baselines and
+    compare the results of two runs, e.g. of two releases.
+"""
+
+
+import gc
+import json
+import platform
+import statistics
+import time
+
+from cuetoolkit import version
+
+
+def measure(func, setup=None, repeat=7, budget=0.01):
+    """
+    Time the calls of 'func'. Without 'setup' the calls are looped until
+    a loop takes at least 'budget' seconds, so fast functions are timed
+    too; with 'setup' every call is timed alone after its untimed setup.
+    :param func: function
+    :param setup: None or function returning a tuple of arguments of 'func'
+    :param repeat: integer, the number of samples
+    :param budget: float
+    :return: dict of statistics in seconds per call
+    """
+    # like timeit, the collector does not interrupt the timed calls
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        samples, number = _sample(func, setup, repeat, budget)
+    finally:
+        if enabled:
+            gc.enable()
+    return {'min': min(samples),
+            'median': statistics.median(samples),
+            'mean': statistics.mean(samples),
+            'stdev': statistics.stdev(samples) if repeat > 1 else 0.0,
+            'repeat': repeat,
+            'number': number}
+
+
+def _sample(func, setup, repeat, budget):
+    number = 1
+    if setup is None:
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            if time.perf_counter() - start >= budget:
+                break
+            number *= 2
+    samples = list()
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        for _ in range(number):
+            func(*args)
+        samples.append((time.perf_counter() - start) / number)
+    return samples, number
+
+
+def format_time(seconds):
+    """
+    Format a time with a suitable unit.
+    :param seconds: float
+    :return: string
+    """
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return '{0:.2f} {1}'.format(seconds / scale, unit)
+    return '{0:.0f} ns'.format(seconds / 1e-9)
+
+
+def save(name, results):
+    """
+    Save 'results' as a baseline.
+    :param name: string (file name)
+    :param results: dict {case: statistics}
+    :return: None
+    """
+    with open(name, 'w', encoding='utf-8') as f:
+        json.dump({'version': version,
+                   'python': platform.python_version(),
+                   'machine': platform.machine(),
+                   'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                   'results': results}, f, indent=1, sort_keys=True)
+
+
+def load(name):
+    """
+    Load a baseline.
+    :param name: string (file name)
+    :return: dict, see save
+    """
+    with open(name, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(results, baseline, threshold=0.1):
+    """
+    Compare 'results' with 'baseline' by the fastest samples, the others
+    are slowed down by the rest of the system rather than by cuetoolkit.
+    :param results: dict {case: statistics}
+    :param baseline: dict {case: statistics}
+    :param threshold: float, the relative change which is not noise
+    :return: list of tuples (case, baseline min, min, ratio, verdict)
+             for cases present in both
+    """
+    rows = list()
+    for case in sorted(set(results) & set(baseline)):
+        old, new = baseline[case]['min'], results[case]['min']
+        ratio = new / old if old else float('inf')
+        if ratio > 1 + threshold:
+            verdict = 'slower'
+        elif ratio < 1 - threshold:
+            verdict = 'faster'
+        else:
+            verdict = ''
+        rows.append((case, old, new, ratio, verdict))
+    return rows
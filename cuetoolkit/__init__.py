@@ -10,11 +10,4 @@
 """
 
 
-import importlib.util
-
-from .exc import show_error
-
 version = '1.0.0.pre'
-
-if importlib.util.find_spec('chardet') is None:
-    show_error('python3 module chardet is not installed')
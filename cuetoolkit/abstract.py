@@ -8,16 +8,22 @@
 """
 
 
+import codecs
 import collections
+import hashlib
 import os
 import re
 import shlex
+import struct
 
-from subprocess import Popen, PIPE
-
-from chardet import detect
-
+from .cache import SheetCache
+from .deps import registry
 from .exc import FileError, InvalidCueError, ReqAppError
+from .timeline import Frames, Millis, Time
+
+Sheet = collections.namedtuple('Sheet', ['meta', 'store'])
+Wave = collections.namedtuple(
+    'Wave', ['channels', 'rate', 'bits', 'block', 'size'])
 
 
 class Checker:
@@ -30,15 +36,14 @@ class Checker:
     def check_dep(dependency):
         """
         Check if 'dependency' exists in any of PATH catalogs and return True,
-        if it does, or None in other case.
+        if it does, or None in other case. PATH is searched only once
+        per process for every dependency.
 
         :param dependency: string
         :return: True or None
         """
-        for path in os.getenv('PATH').split(':'):
-            dep_bin = os.path.join(path, dependency)
-            if os.path.exists(dep_bin):
-                return True
+        if registry.resolve(dependency):
+            return True
         return None
 
 
@@ -60,6 +65,41 @@ class Decoder(Checker):
             if app and not self.check_dep(app):
                 raise ReqAppError('{0} is not installed'. format(app))
 
+    @staticmethod
+    def get_decode_cmd(media):
+        """
+        Get a command decoding 'media' to WAVE on its stdout, or None if
+        'media' is a WAVE file and can be read directly.
+        :param media: string (file name)
+        :return: list or None
+        """
+        cmds = {'.flac': [registry.locate('flac'), '-d', '-c', '-s', media],
+                '.ape': [registry.locate('mac'), media, '-', '-d'],
+                '.wv': [registry.locate('wvunpack'), '-q', media, '-o', '-'],
+                '.wav': None}
+        return cmds.get(os.path.splitext(media)[1].lower())
+
+    @staticmethod
+    def get_seek_cmd(media, start, end):
+        """
+        Get a command decoding samples from 'start' up to 'end' of 'media'
+        to WAVE on its stdout, or None if the format cannot be decoded
+        from an arbitrary position.
+        :param media: string (file name of a FLAC or WavPack image)
+        :param start: integer (the first sample)
+        :param end: integer (the sample after the last one)
+        :return: list or None
+        """
+        ext = os.path.splitext(media)[1].lower()
+        skip, until = '--skip={}'.format(start), '--until={}'.format(end)
+        if ext == '.flac':
+            return [registry.locate('flac'), '-d', '-c', '-s',
+                    skip, until, media]
+        if ext == '.wv':
+            return [registry.locate('wvunpack'), '-q',
+                    skip, until, media, '-o', '-']
+        return None
+
 
 class Encoder(Decoder):
     """
@@ -93,6 +133,7 @@ class MediaSplitter:
         :param command: string containing a viable shntool command
         :return: None
         """
+        from subprocess import PIPE, Popen
         points = '\n'.join(points).encode('utf-8')
         cmd = shlex.split(command)
         with Popen(cmd, stdin=PIPE) as p:
@@ -101,6 +142,86 @@ class MediaSplitter:
             raise RuntimeError('looks like media file is not valid')
 
 
+class WaveData:
+    """
+    This is an abstract class, you do not want to create instances of this
+    class because they will be able to do almost nothing. Nevertheless,
+    I need this class as a super class to create other classes in cuetoolkit.
+    """
+    chunk = 1 << 16
+
+    @staticmethod
+    def read_wave_header(stream):
+        """
+        Read the RIFF WAVE header from 'stream' and leave 'stream' positioned
+        on the first byte of the audio data.
+        :param stream: binary file object
+        :return: namedtuple Wave(channels, rate, bits, block, size), where
+                 size is None if the decoder did not know the data size
+        """
+        head = stream.read(12)
+        if len(head) < 12 or head[:4] != b'RIFF' or head[8:] != b'WAVE':
+            raise RuntimeError('looks like media file is not valid')
+        fmt = None
+        while True:
+            chunk = stream.read(8)
+            if len(chunk) < 8:
+                raise RuntimeError('looks like media file is not valid')
+            name, size = struct.unpack('<4sI', chunk)
+            if name == b'data':
+                if fmt is None:
+                    raise RuntimeError('looks like media file is not valid')
+                if size in (0, 0xffffffff):
+                    size = None
+                return Wave(*fmt, size=size)
+            body = stream.read(size + size % 2)
+            if name == b'fmt ':
+                if len(body) < 16:
+                    raise RuntimeError('looks like media file is not valid')
+                tag, channels, rate, _, block, bits = struct.unpack(
+                    '<HHIIHH', body[:16])
+                if tag not in (1, 0xfffe):
+                    raise RuntimeError('only PCM media files are supported')
+                fmt = (channels, rate, bits, block)
+
+    @staticmethod
+    def gen_wave_header(wave, size):
+        """
+        Generate a canonical 44 bytes PCM WAVE header for 'size' bytes of
+        audio data with parameters of 'wave'.
+        :param wave: namedtuple Wave
+        :param size: integer
+        :return: bytes
+        """
+        return struct.pack(
+            '<4sI4s4sIHHIIHH4sI',
+            b'RIFF', size + 36, b'WAVE', b'fmt ', 16, 1,
+            wave.channels, wave.rate, wave.rate * wave.block,
+            wave.block, wave.bits, b'data', size)
+
+    def copy_pcm(self, stream, size, *sinks):
+        """
+        Pass 'size' bytes of audio data from 'stream', or all the rest of
+        'stream' if 'size' is None, to every of 'sinks' chunk by chunk.
+        :param stream: binary file object
+        :param size: integer or None
+        :param sinks: callables accepting memoryview, e.g. f.write
+        :return: integer, the amount of passed bytes
+        """
+        buf = memoryview(bytearray(self.chunk))
+        copied = 0
+        while size is None or copied < size:
+            want = self.chunk if size is None else min(
+                self.chunk, size - copied)
+            n = stream.readinto(buf[:want])
+            if not n:
+                break
+            for sink in sinks:
+                sink(buf[:n])
+            copied += n
+        return copied
+
+
 class HashCounter:
     """
     This is an abstract class, you do not want to create instances of this
@@ -114,7 +235,8 @@ class HashCounter:
         :param media: a string (file name)
         :return: string containing md5 hash of given media file
         """
-        cmd = shlex.split('shnhash "{0}"'.format(media))
+        from subprocess import PIPE, Popen
+        cmd = [registry.locate('shnhash'), media]
         with Popen(cmd, stdout=PIPE) as p:
             result = p.communicate()
         if p.returncode:
@@ -131,20 +253,16 @@ class LengthConverter:
     @staticmethod
     def convert_to_string(length):
         """
-        Convert the given amount of seconds (length) to a string in format
-        "mm:ss.nn".
-        :param length: float
+        Convert the given length to a string in format "mm:ss.n".
+        :param length: Frames, Millis or float (the amount of seconds)
         :return: string
         """
-        m, s = int(length) // 60, int(length) % 60
-        n = int(round(length - int(length), 1) * 10)
-        if n > 9:
-            s += 1
-            n = 0
-            if s > 59:
-                m += 1
-                s = 0
-        return '{:0{w}d}:{:0{w}d}.{}'.format(m, s, n, w=2)
+        if isinstance(length, Time):
+            tenths = length.to_tenths()
+        else:
+            tenths = int(round(length * 10))
+        return '{:0{w}d}:{:0{w}d}.{}'.format(
+            tenths // 600, tenths // 10 % 60, tenths % 10, w=2)
 
 
 class TLConverter:
@@ -157,19 +275,12 @@ class TLConverter:
     def convert_to_number(time_line):
         """
         Convert a given time_line in format "mm:ss.ff" to a floating point
-        number expressing the amount of seconds (length).
+        number expressing the amount of seconds (length), use Frames to
+        compute with times.
         :param time_line: string in format "mm:ss.ff"
         :return: float
         """
-        mm, ss, ff = re.split(r'[:.]', time_line)
-        if int(ss) > 59 or int(ff) > 74:
-            raise InvalidCueError('this cuesheet has an invalid timestamp')
-        ss = int(mm) * 60 + int(ss)
-        nnn = round(int(ff) / 0.075)
-        if nnn > 999:
-            ss += 1
-            nnn = 0
-        return ss + nnn / 1000
+        return Frames.parse(time_line).seconds
 
 
 class LengthCounter(TLConverter):
@@ -182,29 +293,117 @@ class LengthCounter(TLConverter):
     def convert_to_seconds(time_line):
         """
         Convert a given time line in format "mm:ss.nnn" to a floating point
-        number expressing the amount of seconds (length).
+        number expressing the amount of seconds (length), use Millis to
+        compute with times.
         :param time_line: string in format "mm:ss.nnn"
         :return: float
         """
-        mm, ss, nnn = re.split(r'[:.]', time_line)
-        return int(mm) * 60 + int(ss) + int(nnn) / 1000
+        return Millis.parse(time_line).seconds
+
+    def _convert_pcm_length(self, wave, size):
+        """
+        Count the length of 'size' bytes of audio data with parameters of
+        'wave' the way shnlen does, a CDDA image has CD quality, contains
+        whole CD sectors and is long enough to be burned.
+        :param wave: namedtuple Wave
+        :param size: integer
+        :return: tuple (Frames, 'CDDA') or (Millis, 'not CDDA')
+        """
+        if (wave.channels, wave.rate, wave.bits) == (2, 44100, 16) and \
+                not size % 2352 and size >= 705600:
+            return Frames.from_bytes(size), 'CDDA'
+        return Millis.from_samples(size // wave.block, wave.rate), \
+            'not CDDA'
+
+    @staticmethod
+    def read_header(media):
+        """
+        Read parameters of 'media' from its header, FLAC and WavPack headers
+        are read with mutagen, WAVE header is read in place.
+        :param media: string (file name)
+        :return: namedtuple Wave or None if the header cannot be trusted
+        """
+        ext = os.path.splitext(media)[1].lower()
+        if ext in ('.flac', '.wv'):
+            from .mutagen.length import read_stream_info
+            return read_stream_info(media)
+        if ext != '.wav':
+            return None
+        try:
+            with open(media, 'rb') as f:
+                wave = WaveData.read_wave_header(f)
+                if wave.size is None or \
+                        f.tell() + wave.size > os.fstat(f.fileno()).st_size:
+                    return None
+                return wave
+        except (OSError, RuntimeError):
+            return None
 
     def _count_length(self, media):
         if media is None:
             return None, None
-        cmd = shlex.split('shnlen -ct "{}"'.format(media))
+        wave = self.read_header(media)
+        if wave:
+            return self._convert_pcm_length(wave, wave.size)
+        from subprocess import PIPE, Popen
+        cmd = [registry.locate('shnlen'), '-ct', media]
         with Popen(cmd, stdout=PIPE, stderr=PIPE) as p:
             result = p.communicate()
         if p.returncode:
             raise RuntimeError('looks like media file is not valid')
-        result = result[0].decode('utf-8').split()
+        return self.parse_length(result[0])
+
+    @staticmethod
+    def parse_length(output):
+        """
+        Parse the output of 'shnlen -ct'.
+        :param output: bytes
+        :return: tuple (Frames, 'CDDA') or (Millis, 'not CDDA')
+        """
+        result = output.decode('utf-8').split()
         cdda = result[3]
         if cdda == '---':
             cdda = 'CDDA'
-            return self.convert_to_number(result[0]), cdda
+            return Frames.parse(result[0]), cdda
         else:
             cdda = 'not CDDA'
-            return self.convert_to_seconds(result[0]), cdda
+            return Millis.parse(result[0]), cdda
+
+
+class StreamCounter(LengthCounter, WaveData):
+    """
+    This is an abstract class, you do not want to create instances of this
+    class because they will be able to do almost nothing. Nevertheless,
+    I need this class as a super class to create other classes in cuetoolkit.
+    """
+    def _scan_media(self, media):
+        """
+        Decode 'media' once and count its length, CDDA conformity and the
+        md5 hash of its PCM together, the results match shnlen and shnhash.
+        :param media: string (file name)
+        :return: tuple (length, 'CDDA' or 'not CDDA', md5 hash)
+        """
+        cmd = Decoder.get_decode_cmd(media)
+        if cmd is None:
+            p, stream = None, open(media, 'rb')
+        else:
+            from subprocess import DEVNULL, PIPE, Popen
+            p = Popen(cmd, stdout=PIPE, stderr=DEVNULL)
+            stream = p.stdout
+        md5 = hashlib.md5()
+        try:
+            wave = self.read_wave_header(stream)
+            size = self.copy_pcm(stream, wave.size, md5.update)
+            while stream.read(self.chunk):
+                pass
+        finally:
+            stream.close()
+            if p:
+                p.wait()
+        if (p and p.returncode) or (wave.size and size != wave.size):
+            raise RuntimeError('looks like media file is not valid')
+        length, cdda = self._convert_pcm_length(wave, size)
+        return length, cdda, md5.hexdigest()
 
 
 class Reader(Checker):
@@ -213,26 +412,96 @@ class Reader(Checker):
     class because they will be able to do almost nothing. Nevertheless,
     I need this class as a super class to create other classes in cuetoolkit.
     """
+    # the default of instances, True checks the file type with file(1)
+    # instead of sniffing it in place
+    strict = False
+    sniff_size = 4096
+    # chardet never sees more than this amount of bytes
+    detect_limit = 1 << 16
+
+    @staticmethod
+    def sniff_text(head):
+        """
+        Guess if 'head', the first bytes of a file, belongs to a text file:
+        a BOM means text, a NUL byte means binary, otherwise the file is
+        a text if less than 30% of its bytes are control characters.
+        :param head: bytes
+        :return: True or False
+        """
+        if head.startswith((codecs.BOM_UTF8,
+                            codecs.BOM_UTF32_LE,
+                            codecs.BOM_UTF32_BE,
+                            codecs.BOM_UTF16_LE,
+                            codecs.BOM_UTF16_BE)):
+            return True
+        if not head or b'\x00' in head:
+            return False
+        text = bytes((7, 8, 9, 10, 12, 13, 27)) + bytes(range(32, 127)) +\
+            bytes(range(128, 256))
+        return len(head.translate(None, text)) / len(head) < 0.3
+
     def _detect_file_type(self, name):
         required = 'file'
         if self.check_dep(required) is None:
             raise ReqAppError('{} is not installed'.format(required))
-        cmd = shlex.split('file -b -i "{}"'.format(name))
+        from subprocess import PIPE, Popen
+        cmd = [registry.locate(required), '-b', '-i', name]
         with Popen(cmd, stdout=PIPE, stderr=PIPE) as p:
             result = p.communicate()
         if p.returncode:
             raise RuntimeError('something bad happened')
         return result[0].decode('utf-8')
 
+    def _detect_encoding(self, data):
+        """
+        Detect the encoding of 'data' and decode it: a BOM is checked first,
+        then strict UTF-8 is tried, and only then chardet is being fed with
+        a bounded sample until it is sure.
+        :param data: bytes
+        :return: tuple (text, encoding, confidence)
+        """
+        boms = ((codecs.BOM_UTF32_LE, 'utf-32'),
+                (codecs.BOM_UTF32_BE, 'utf-32'),
+                (codecs.BOM_UTF8, 'utf-8-sig'),
+                (codecs.BOM_UTF16_LE, 'utf-16'),
+                (codecs.BOM_UTF16_BE, 'utf-16'))
+        for bom, enc in boms:
+            if data.startswith(bom):
+                return data.decode(enc), enc, 1.0
+        try:
+            return data.decode('utf-8'), 'utf-8', 1.0
+        except UnicodeDecodeError:
+            pass
+        try:
+            from chardet.universaldetector import UniversalDetector
+        except ImportError:
+            raise ReqAppError('python3 module chardet is not installed')
+        detector = UniversalDetector()
+        for start in range(0, min(len(data), self.detect_limit), 4096):
+            detector.feed(data[start:start + 4096])
+            if detector.done:
+                break
+        detector.close()
+        enc = detector.result['encoding']
+        if enc is None:
+            raise ValueError('unknown encoding')
+        return data.decode(enc), enc.lower(), detector.result['confidence']
+
     def _read_file(self, name):
-        if self._detect_file_type(name).split('/')[0] != 'text':
+        if self.strict and \
+                self._detect_file_type(name).split('/')[0] != 'text':
             return 'this file is not a cuesheet'
         try:
             with open(name, 'rb') as f:
-                enc = detect(f.read())['encoding']
-                f.seek(0)
-                return [line.decode(enc).rstrip() for line in f]
-        except (OSError, ValueError):
+                data = f.read()
+            if not self.strict and not self.sniff_text(data[:self.sniff_size]):
+                return 'this file is not a cuesheet'
+            text, self.encoding, self.confidence = self._detect_encoding(data)
+            return [line.rstrip() for line in text.splitlines()]
+        except ReqAppError:
+            # a missing dependency is not a problem of the cuesheet
+            raise
+        except (OSError, ValueError, LookupError):
             return 'this cuesheet has bad encoding or cannot be read'
 
 
@@ -261,84 +530,102 @@ class Writer:
             return None
 
 
-class ContentTool:
+class Parser:
     """
     This is an abstract class, you do not want to create instances of this
     class because they will be able to do almost nothing. Nevertheless,
     I need this class as a super class to create other classes in cuetoolkit.
     """
-    @staticmethod
-    def get_value(content, pattern):
+    def _pattern_sheet(self):
+        pattern = collections.namedtuple(
+            'Pattern',
+            ['line', 'track', 'index', 'fields', 'lists', 'indices'])
+        return pattern(
+            line=re.compile(r'^( *)(REM \S+|INDEX \S+|\S+) +(.+)'),
+            track=re.compile(r'^(\d+) +.'),
+            index=re.compile(r'^(\d{2}:\d{2}:\d{2})'),
+            # (indented, keyword): field
+            fields={(False, 'PERFORMER'): 'art_a',
+                    (False, 'TITLE'): 'album',
+                    (False, 'REM GENRE'): 'genre',
+                    (False, 'REM DISCID'): 'd_id',
+                    (False, 'REM DATE'): 'year',
+                    (False, 'REM COMMENT'): 'comm'},
+            lists={(True, 'TITLE'): 'title',
+                   (True, 'PERFORMER'): 'artist',
+                   (True, 'TGENRE'): 'tgenre',
+                   (True, 'TDATE'): 'tdate'},
+            indices={'INDEX 00': 0, 'INDEX 01': 1})
+
+    def _parse(self, content):
         """
-        Check if 'content' contains a string matching 'pattern' and return
-        a required fragment of this string.
+        Parse cuesheet 'content' in a single pass, every line is matched
+        once and dispatched by its keyword.
         :param content: list containing strings
-        :param pattern: compiled regular expression
-        :return: string
+        :return: namedtuple Sheet(meta, store), where meta is a dict of
+                 cuesheet fields and store is a dict of indices
         """
+        pats = self._pattern_sheet()
+        meta = {field: None for field in pats.fields.values()}
+        # per-track fields are kept under the numbers of their tracks
+        meta.update({field: dict() for field in pats.lists.values()})
+        meta['track'] = list()
+        store, current = dict(), None
         for line in content:
-            box = pattern.match(line)
-            if box:
-                return box.group(1).strip('"')
-
-    @staticmethod
-    def get_values(content, pattern):
-        """
-        Check if 'content' contains strings matching 'pattern' and return
-        a list containing a required fragments of these strings.
-        :param content: list containing strings
-        :param pattern: compiled regular expression
-        :return: list of strings
-        """
-        return [pattern.match(line).group(1).strip('"') for line in content
-                if pattern.match(line)]
-
-
-class Extractor(Reader):
+            box = pats.line.match(line)
+            if box is None:
+                continue
+            key = (bool(box.group(1)), box.group(2))
+            if key in pats.lists:
+                if current is not None:
+                    meta[pats.lists[key]].setdefault(
+                        current, box.group(3).strip('"'))
+            elif key in pats.fields:
+                if meta[pats.fields[key]] is None:
+                    meta[pats.fields[key]] = box.group(3).strip('"')
+            elif key == (True, 'TRACK'):
+                track = pats.track.match(box.group(3))
+                if track:
+                    current = track.group(1)
+                    meta['track'].append(current)
+                    store[current] = [None, None]
+            elif key[0] and key[1] in pats.indices and current is not None:
+                index = pats.index.match(box.group(3))
+                if index:
+                    store[current][pats.indices[key[1]]] = index.group(1)
+        return Sheet(meta, store)
+
+
+class Extractor(Parser, Reader):
     """
     This is an abstract class, you do not want to create instances of this
     class because they will be able to do almost nothing. Nevertheless,
     I need this class as a super class to create other classes in cuetoolkit.
     """
+    # the default of instances, True looks for parsed cuesheets in the
+    # on-disk cache first
+    use_cache = True
+
     def _get_content(self, name):
         content = self._read_file(name)
         if isinstance(content, str):
             raise FileError(content)
         return content
 
-
-class MetaData(ContentTool):
-    """
-    This is an abstract class, you do not want to create instances of this
-    class because they will be able to do almost nothing. Nevertheless,
-    I need this class as a super class to create other classes in cuetoolkit.
-    """
-    def _pattern_data(self):
-        pattern = collections.namedtuple(
-            'Pattern',
-            ['art_a',
-             'album',
-             'genre',
-             'd_id',
-             'year',
-             'comm',
-             'title',
-             'artist',
-             'tgenre',
-             'tdate',
-             'track'])
-        return pattern(
-            art_a=re.compile(r'^PERFORMER +(.+)'),
-            album=re.compile(r'^TITLE +(.+)'),
-            genre=re.compile(r'^REM GENRE +(.+)'),
-            d_id=re.compile(r'^REM DISCID +(.+)'),
-            year=re.compile(r'^REM DATE +(.+)'),
-            comm=re.compile(r'^REM COMMENT +(.+)'),
-            title=re.compile(r'^ +TITLE +(.+)'),
-            artist=re.compile(r'^ +PERFORMER +(.+)'),
-            tgenre=re.compile(r'^ +TGENRE +(.+)'),
-            tdate=re.compile(r'^ +TDATE +(.+)'),
-            track=re.compile(r'^ +TRACK +(\d+) +(.+)'))
+    def _get_sheet(self, name):
+        cache = None
+        if self.use_cache and not self.strict:
+            cache = SheetCache()
+            entry = cache.get(name)
+            if entry:
+                self.encoding = entry['encoding']
+                self.confidence = entry['confidence']
+                return Sheet(entry['meta'], entry['store'])
+        sheet = self._parse(self._get_content(name))
+        if cache:
+            cache.put(name, sheet.meta, sheet.store,
+                      self.encoding, self.confidence)
+        return sheet
 
 
 class NotCDDAPointsData:
@@ -355,9 +642,7 @@ class NotCDDAPointsData:
         :return: string in format "mm:ss.nnn"
         """
         if line:
-            parts = line.split(':')
-            nnn = round(int(parts[2]) / 0.075)
-            return '{0}:{1}.{2:<0{3}}'.format(int(parts[0]), parts[1], nnn, 3)
+            return Frames.parse(line).to(Millis).format()
 
 
 class PointsData:
@@ -366,15 +651,6 @@ class PointsData:
     class because they will be able to do almost nothing. Nevertheless,
     I need this class as a super class to create other classes in cuetoolkit.
     """
-    def _pattern_indices(self):
-        pattern = collections.namedtuple(
-            'Pattern',
-            ['track', 'index0', 'index1'])
-        return pattern(
-            track=re.compile(r'^ +TRACK +(\d+) +(.+)'),
-            index0=re.compile(r'^ +INDEX 00 +(\d{2}:\d{2}:\d{2})'),
-            index1=re.compile(r'^ +INDEX 01 +(\d{2}:\d{2}:\d{2})'))
-
     def _validate_indices(self, store):
         if not store:
             raise InvalidCueError('no indices in your cuesheet')
@@ -382,30 +658,8 @@ class PointsData:
             if key != '01' and not store[key][1]:
                 raise InvalidCueError('bad indices for track {}'.format(key))
 
-    @staticmethod
-    def match_indices(item, line, pats, store):
-        index0 = pats.index0.match(line)
-        index1 = pats.index1.match(line)
-        if index0:
-            store[item][0] = index0.group(1)
-        if index1:
-            store[item][1] = index1.group(1)
-
-    def _extract_indices(self, content):
-        store, bounds, pats = dict(), list(), self._pattern_indices()
-        for line in content:
-            track = pats.track.match(line)
-            if track:
-                key = track.group(1)
-                store[key] = [None, None]
-                bounds.append(content.index(line))
-        for step, item in enumerate(sorted(store)):
-            if step < len(store) - 1:
-                for line in content[bounds[step]:bounds[step + 1]]:
-                    self.match_indices(item, line, pats, store)
-            else:
-                for line in content[bounds[step]:]:
-                    self.match_indices(item, line, pats, store)
+    def _extract_indices(self, store):
+        store = {key: list(store[key]) for key in store}
         self._validate_indices(store)
         if store['01'][0] == '00:00:00':
             store['01'][0] = None
@@ -421,11 +675,10 @@ class PointsData:
         :return: string in format "mm:ss.ff"
         """
         if line:
-            parts = line.split(':')
-            return '{0}:{1}.{2}'.format(int(parts[0]), parts[1], parts[2])
+            return Frames.parse(line).format()
 
-    def _arrange_indices(self, content):
-        indices = self._extract_indices(content)
+    def _arrange_indices(self, store):
+        indices = self._extract_indices(store)
         return {key: (self.convert_time_line(indices[key][0]),
                       self.convert_time_line(indices[key][1]))
                 for key in indices}
@@ -438,19 +691,22 @@ class Rename:
     I need this class as a super class to create other classes in cuetoolkit.
     """
     @staticmethod
-    def rename_file(file_name, step, cue):
+    def rename_file(file_name, step, disc):
         """
-        Rename a given file in compliance with 'cue' content.
+        Rename a given file in compliance with 'disc' content.
         :param file_name: string
         :param step: integer
-        :param cue: instance of CueCDDA or NotCDDACue
+        :param disc: instance of Disc
         :return: string or None
         """
-        title = re.sub(r'[\\/|?<>*:]', '~', cue.title[step])
-        artist = re.sub(r'[\\/|?<>*:]', '~', cue.artist[step])
+        track = disc[step]
+        title = re.sub(r'[\\/|?<>*:]', '~', track.title)
+        artist = re.sub(r'[\\/|?<>*:]', '~', track.artist)
         extension = os.path.splitext(file_name)[1].lower()
-        new_name = '{0} - {1} - {2}{3}'.format(
-            cue.track[step], artist, title, extension)
+        new_name = os.path.join(
+            os.path.dirname(file_name),
+            '{0} - {1} - {2}{3}'.format(
+                track.number, artist, title, extension))
         try:
             os.rename(file_name, new_name)
         except OSError:
@@ -0,0 +1,307 @@
+"""
+    cuetoolkit.aio
+    ~~~~~~~~~~~~~~
+
+    Coroutines running splitters, decoders, length and hash counters and
+    taggers of cuetoolkit in an asyncio event loop, so many images can be
+    driven from one thread. Every process is killed as soon as its
+    coroutine is cancelled or its timeout expires, pipes are read and
+    written chunk by chunk and never hold more than a chunk of audio data.
+    A process runs in its own process group, so the encoders shnsplit
+    starts are killed with it.
+"""
+
+
+import asyncio
+import hashlib
+import io
+import os
+import shlex
+import signal
+
+from subprocess import DEVNULL, PIPE
+
+from .abstract import Decoder, LengthCounter, StreamCounter, WaveData
+from .deps import registry
+
+
+async def _reap(p):
+    if p.returncode is None:
+        try:
+            # the group of the process, its children go with it
+            os.killpg(p.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    await p.wait()
+
+
+async def run(cmd, data=None, timeout=None, capture=True, stderr=None):
+    """
+    Run 'cmd' in subprocess.
+    :param cmd: list
+    :param data: bytes for stdin of the process or None
+    :param timeout: None or seconds, the process and its children are
+                    killed after it
+    :param capture: True to return stdout of the process, False to pass
+                    it through
+    :param stderr: None to pass stderr of the process through, DEVNULL to
+                   drop it
+    :return: tuple (return code, bytes or None)
+    """
+    p = await asyncio.create_subprocess_exec(
+        *cmd, stdin=DEVNULL if data is None else PIPE,
+        stdout=PIPE if capture else None, stderr=stderr,
+        start_new_session=True)
+    try:
+        output, _ = await asyncio.wait_for(p.communicate(data), timeout)
+    except BaseException:
+        await _reap(p)
+        raise
+    return p.returncode, output
+
+
+async def split_media(command, points, timeout=None):
+    """
+    The coroutine version of MediaSplitter.split_media.
+    :param command: string containing a viable shntool command
+    :param points: list containing strings in format 'mm:ss.ff'
+                   or 'mm:ss.nnn'
+    :param timeout: None or seconds
+    :return: None
+    """
+    code, _ = await run(shlex.split(command),
+                        '\n'.join(points).encode('utf-8'), timeout, False)
+    if code:
+        raise RuntimeError('looks like media file is not valid')
+
+
+async def count_length(media, timeout=None):
+    """
+    The coroutine version of LengthCounter._count_length.
+    :param media: string (file name)
+    :param timeout: None or seconds
+    :return: tuple (Frames, 'CDDA') or (Millis, 'not CDDA')
+    """
+    counter = LengthCounter()
+    wave = await asyncio.get_event_loop().run_in_executor(
+        None, counter.read_header, media)
+    if wave:
+        return counter._convert_pcm_length(wave, wave.size)
+    code, output = await run(
+        [registry.locate('shnlen'), '-ct', media], timeout=timeout,
+        stderr=DEVNULL)
+    if code:
+        raise RuntimeError('looks like media file is not valid')
+    return counter.parse_length(output)
+
+
+async def count_hash(media, timeout=None):
+    """
+    The coroutine version of HashCounter.count_hash.
+    :param media: string (file name)
+    :param timeout: None or seconds
+    :return: string containing md5 hash of given media file
+    """
+    code, output = await run(
+        [registry.locate('shnhash'), media], timeout=timeout)
+    if code:
+        raise RuntimeError('looks like media file is not valid')
+    return output.decode('utf-8').split()[0]
+
+
+async def _digest(stream):
+    # the header is parsed from the first chunk, it is a few bytes long
+    head = b''
+    while len(head) < WaveData.chunk:
+        data = await stream.read(WaveData.chunk - len(head))
+        if not data:
+            break
+        head += data
+    buf = io.BytesIO(head)
+    wave = WaveData.read_wave_header(buf)
+    data = head[buf.tell():]
+    md5, size = hashlib.md5(), 0
+    while data:
+        if wave.size is not None:
+            # the rest of the stream is read to let the decoder exit
+            data = data[:wave.size - size]
+        md5.update(data)
+        size += len(data)
+        data = await stream.read(WaveData.chunk)
+    return wave, size, md5.hexdigest()
+
+
+async def scan_media(media, timeout=None):
+    """
+    The coroutine version of StreamCounter._scan_media, 'media' is
+    decoded once for its length, CDDA conformity and md5 hash.
+    :param media: string (file name)
+    :param timeout: None or seconds
+    :return: tuple (length, 'CDDA' or 'not CDDA', md5 hash)
+    """
+    cmd = Decoder.get_decode_cmd(media)
+    if cmd is None:
+        return await asyncio.get_event_loop().run_in_executor(
+            None, StreamCounter()._scan_media, media)
+    p = await asyncio.create_subprocess_exec(
+        *cmd, stdout=PIPE, stderr=DEVNULL, start_new_session=True)
+
+    async def scan():
+        result = await _digest(p.stdout)
+        await p.wait()
+        return result
+    try:
+        wave, size, md5 = await asyncio.wait_for(scan(), timeout)
+    except BaseException:
+        await _reap(p)
+        raise
+    if p.returncode or (wave.size and size != wave.size):
+        raise RuntimeError('looks like media file is not valid')
+    length, cdda = LengthCounter()._convert_pcm_length(wave, size)
+    return length, cdda, md5
+
+
+async def write_meta(tagger, file_name, step, disc):
+    """
+    The coroutine version of Tagger.write_meta, it runs in the default
+    executor of the event loop. A thread cannot be stopped, so a cancelled
+    coroutine waits until the file is written.
+    :param tagger: Tagger after prepare
+    :param file_name: string
+    :param step: integer
+    :param disc: instance of Disc
+    :return: the amount of rewritten bytes or None
+    """
+    future = asyncio.get_event_loop().run_in_executor(
+        None, tagger.write_meta, file_name, step, disc)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await asyncio.wait([future])
+        raise
+
+
+async def tag_tracks(writer, rename, quiet, jobs=4, file=None):
+    """
+    The coroutine version of TagWriter.write_metadata, up to 'jobs' tracks
+    are tagged at a time, tracks are not tagged any more once it is
+    cancelled.
+    :param writer: TagWriter after prepare
+    :param rename: True or False
+    :param quiet: True or False
+    :param jobs: integer
+    :param file: file object to print to, sys.stdout if None
+    :return: None
+    """
+    loop = asyncio.get_event_loop()
+    slots = asyncio.Semaphore(jobs)
+
+    async def tag(step, item):
+        async with slots:
+            return await write_meta(
+                writer.tagger, os.path.join(writer.directory, item), step,
+                writer.cue.disc)
+    tasks = [loop.create_task(tag(step, item))
+             for step, item in enumerate(writer.files)]
+    block = writer._gen_block()
+    try:
+        for step, (item, task) in enumerate(zip(writer.files, tasks)):
+            size = await task
+            await loop.run_in_executor(
+                None, writer._finish_track,
+                step, item, size, rename, quiet, block, file)
+    finally:
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks)
+
+
+async def split_image(converter, rename, done=(), timeout=None):
+    """
+    Split the image of 'converter' with shnsplit in its private directory,
+    every track is tagged, renamed and published as soon as shnsplit
+    closes it, with inotify or by polling.
+    :param converter: Converter with one media type, prepared and inside
+                      its private directory
+    :param rename: True or False
+    :param done: numbers of finished pieces
+    :param timeout: None or seconds for shnsplit
+    :return: None
+    """
+    from .converter.watch import Watcher
+    loop = asyncio.get_event_loop()
+    target = converter.targets[0]
+    steps = converter._gen_steps(converter.points)
+    queue = [number for number in sorted(steps) if number not in done]
+    names = {os.path.basename(converter._gen_name(number, target)): number
+             for number in queue}
+    tasks = list()
+
+    async def settle(number):
+        await write_meta(target.tagger, converter._gen_name(number, target),
+                         steps[number], converter.cue.disc)
+        await loop.run_in_executor(
+            None, converter._settle_piece,
+            number, steps[number], target, rename)
+
+    def finish(number):
+        names.pop(os.path.basename(converter._gen_name(number, target)))
+        queue.remove(number)
+        tasks.append(loop.create_task(settle(number)))
+
+    def ready():
+        for item in watcher.read(0):
+            # tagging closes the file again, every track is taken once
+            if item in names:
+                finish(names[item])
+    try:
+        watcher = Watcher(target.work)
+        loop.add_reader(watcher.fd, ready)
+    except OSError:
+        watcher = None
+    split = loop.create_task(split_media(
+        converter._gen_split(done), converter.points, timeout))
+    try:
+        while not split.done():
+            await asyncio.wait([split], timeout=0.1)
+            # without inotify a piece is finished when the next one appears
+            while watcher is None and len(queue) > 1 and os.path.exists(
+                    converter._gen_name(queue[1], target)):
+                finish(queue[0])
+        split.result()
+        if watcher:
+            ready()
+        for number in list(queue):
+            if os.path.exists(converter._gen_name(number, target)):
+                finish(number)
+    finally:
+        if not split.done():
+            split.cancel()
+            await asyncio.wait([split])
+        if watcher:
+            loop.remove_reader(watcher.fd)
+            watcher.close()
+        if tasks:
+            await asyncio.wait(tasks)
+    for task in tasks:
+        task.result()
+
+
+async def convert(converter, rename, timeout=None):
+    """
+    The coroutine version of Converter.convert splitting with shnsplit.
+    :param converter: Converter with one media type after check_data
+    :param rename: True or False
+    :param timeout: None or seconds for shnsplit
+    :return: None
+    """
+    if len(converter.targets) > 1:
+        raise ValueError('shnsplit cannot make several media types')
+    # the finished tracks of the previous run are checked by their md5
+    done = await asyncio.get_event_loop().run_in_executor(
+        None, converter._prepare, rename)
+    if done is None:
+        return
+    with converter._private():
+        await split_image(converter, rename, done, timeout)
@@ -0,0 +1,262 @@
+"""
+    cuetoolkit.cache
+    ~~~~~~~~~~~~~~~~
+
+    SheetCache keeps parsed cuesheets on disk, a cuesheet is not read,
+    sniffed and parsed again until its path, mtime or size changes.
+    EncodeCache keeps encoded tracks addressed by their audio data and
+    encoder, so the same track is not encoded twice.
+    The least recently used entries are evicted when a cache grows
+    over its limit. The size of a cache is kept in its '.size' file, so
+    the entries are listed only when it is over the limit.
+"""
+
+
+import hashlib
+import os
+import threading
+
+from . import version
+from .system import cache_dir, track_dir
+
+
+class Cache:
+    """
+    This is an abstract class, you do not want to create instances of this
+    class because they will be able to do almost nothing. Nevertheless,
+    I need this class as a super class to create other classes in cuetoolkit.
+    """
+    # the file keeping the running size of the cache
+    tally = '.size'
+
+    def __init__(self, home, limit):
+        """
+        :param home: the cache directory
+        :param limit: the maximum size of the cache in bytes
+        """
+        self.home = home
+        self.limit = limit
+        self.lock = threading.Lock()
+
+    def _read_size(self):
+        try:
+            with open(os.path.join(self.home, self.tally), 'r') as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def _write_size(self, total):
+        import tempfile
+        fd, tmp = tempfile.mkstemp(dir=self.home, prefix='.')
+        with open(fd, 'w') as f:
+            f.write(str(total))
+        os.replace(tmp, os.path.join(self.home, self.tally))
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fills three
+        quarters of its limit, so the entries are not listed again on the
+        next entry, and save the size of the cache.
+        :return: None
+        """
+        entries = list()
+        for item in os.listdir(self.home):
+            if item == self.tally:
+                continue
+            try:
+                st = os.stat(os.path.join(self.home, item))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, item))
+        total = sum(size for _, size, _ in entries)
+        if total > self.limit:
+            for _, size, item in sorted(entries):
+                if total <= self.limit * 3 // 4:
+                    break
+                try:
+                    os.remove(os.path.join(self.home, item))
+                except OSError:
+                    pass
+                total -= size
+        self._write_size(total)
+
+    def add(self, tmp, path):
+        """
+        Move the new entry 'tmp' to 'path' and add it to the size of the
+        cache, the cache is evicted only when the size is over the limit
+        or unknown. Other processes may change the cache too, so the size
+        is an estimate counted again on every eviction.
+        :param tmp: string (file name)
+        :param path: string (file name)
+        :return: None
+        """
+        with self.lock:
+            try:
+                old = os.path.getsize(path)
+            except OSError:
+                old = 0
+            os.replace(tmp, path)
+            total = self._read_size()
+            if total is None:
+                self.evict()
+                return
+            total += os.path.getsize(path) - old
+            if total > self.limit:
+                self.evict()
+            else:
+                self._write_size(total)
+
+
+class SheetCache(Cache):
+    """
+    This can save and load parsed cuesheets.
+    """
+    # the shape of a parsed cuesheet, see Parser._parse; entries of
+    # another shape are parsed again
+    layout = 2
+
+    def __init__(self, home=cache_dir, limit=8 << 20):
+        Cache.__init__(self, home, limit)
+
+    @staticmethod
+    def gen_key(name):
+        """
+        Generate the cache key for the file 'name'.
+        :param name: string (file name)
+        :return: list [realpath, mtime in nanoseconds, size]
+        """
+        path = os.path.realpath(name)
+        st = os.stat(path)
+        return [path, st.st_mtime_ns, st.st_size]
+
+    def _gen_path(self, key):
+        return os.path.join(
+            self.home, hashlib.sha1(key[0].encode('utf-8')).hexdigest())
+
+    def get(self, name):
+        """
+        Get the cached entry for the file 'name'.
+        :param name: string (file name)
+        :return: dict or None
+        """
+        import json
+        try:
+            key = self.gen_key(name)
+            path = self._gen_path(key)
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if entry.get('key') != key or \
+                    entry.get('version') != version or \
+                    entry.get('layout') != self.layout:
+                return None
+            # the mtime of an entry is its last use
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def put(self, name, meta, store, encoding, confidence):
+        """
+        Save the parsed cuesheet 'name' into the cache, errors are ignored.
+        :param name: string (file name)
+        :param meta: dict of cuesheet fields
+        :param store: dict of indices
+        :param encoding: string
+        :param confidence: float
+        :return: None
+        """
+        import json
+        import tempfile
+        try:
+            key = self.gen_key(name)
+            os.makedirs(self.home, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.home, prefix='.')
+            with open(fd, 'w', encoding='utf-8') as f:
+                json.dump({'key': key,
+                           'version': version,
+                           'layout': self.layout,
+                           'meta': meta,
+                           'store': store,
+                           'encoding': encoding,
+                           'confidence': confidence}, f, ensure_ascii=False)
+            self.add(tmp, self._gen_path(key))
+        except (OSError, ValueError):
+            pass
+
+
+class EncodeCache(Cache):
+    """
+    This can save encoded tracks and copy them into place later.
+    """
+    def __init__(self, home=track_dir, limit=1 << 30):
+        Cache.__init__(self, home, limit)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def gen_key(digest, media_type, encoder):
+        """
+        Generate the cache key of a track.
+        :param digest: string, the hash of the track's audio data
+        :param media_type: string
+        :param encoder: list, the encoder command
+        :return: string
+        """
+        import json
+        return hashlib.sha1(json.dumps(
+            [version, digest, media_type, encoder]).encode('utf-8')
+        ).hexdigest()
+
+    def fetch(self, key, name):
+        """
+        Copy the cached track 'key' to 'name'.
+        :param key: string
+        :param name: string (file name)
+        :return: True on a hit, False on a miss
+        """
+        import shutil
+        path = os.path.join(self.home, key)
+        try:
+            # a copy, tagging rewrites files in place
+            shutil.copyfile(path, name)
+            os.utime(path)
+        except OSError:
+            hit = False
+        else:
+            hit = True
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return hit
+
+    def put(self, key, name):
+        """
+        Save the encoded and not yet tagged track 'name', errors are
+        ignored.
+        :param key: string
+        :param name: string (file name)
+        :return: None
+        """
+        import shutil
+        import tempfile
+        tmp = None
+        try:
+            os.makedirs(self.home, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.home, prefix='.')
+            os.close(fd)
+            shutil.copyfile(name, tmp)
+            self.add(tmp, os.path.join(self.home, key))
+        except OSError:
+            if tmp and os.path.exists(tmp):
+                os.remove(tmp)
+
+    def report(self):
+        """
+        Get hit/miss statistics.
+        :return: string
+        """
+        total = self.hits + self.misses
+        return 'encode cache: {0} hits, {1} misses ({2:.0%} hit rate)'.format(
+            self.hits, self.misses, self.hits / total if total else 0)
@@ -0,0 +1,31 @@
+"""
+    cuetoolkit.client
+    ~~~~~~~~~~~~~~~~~
+
+    The thin client of cuetoolkit.daemon, it sends a job to the daemon
+    and reads the events of the job back.
+"""
+
+
+import json
+import socket
+
+
+def submit(path, command, args):
+    """
+    Send a job to the daemon listening on 'path'.
+    :param path: the socket file name
+    :param command: 'split', 'report' or 'tag'
+    :param args: dict of the job's arguments
+    :return: iterator of events (dict), the last one is 'done' or 'error'
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        try:
+            s.connect(path)
+        except OSError:
+            raise RuntimeError('the daemon is not running')
+        request = {'command': command, 'args': args}
+        s.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        with s.makefile('r', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
@@ -12,35 +12,64 @@
 import os
 
 from . import version
-from .abstract import Extractor, MetaData, NotCDDAPointsData, PointsData
+from .abstract import Extractor, NotCDDAPointsData, PointsData
 from .exc import FileError, InvalidCueError
+from .model import Disc
 
 
-class Cue(MetaData, Extractor):
+class Cue(Extractor):
     """
     This is a cuesheet extractor, the main target for this class is cuesheet
-    metadata.
+    metadata. The metadata is kept in 'disc', an instance of Disc, the rest
+    of attributes are views of it kept for compatibility.
     """
-    def __init__(self):
-        self.art_a = None
-        self.album = None
-        self.genre = None
-        self.d_id = None
-        self.year = None
-        self.comm = None
-        self.comment = None
-        self.title = None
-        self.artist = None
-        self.tgenre = None
-        self.tdate = None
-        self.track = None
-
-    def _validate_metadata(self):
-        for i in sorted(self.__dict__):
-            if i in ('album', 'art_a', 'track', 'title'):
-                if not self.__dict__[i]:
-                    raise InvalidCueError('this cuesheet is not valid')
-        if len(self.track) != len(self.title):
+    def __init__(self, strict=False, use_cache=True):
+        """
+        :param strict: True or False, check the file type with file(1)
+        :param use_cache: True or False, look for parsed cuesheets in the
+                          cache first
+        """
+        self.strict = strict
+        self.use_cache = use_cache
+        self.disc = None
+        self.encoding = None
+        self.confidence = None
+
+    def _disc_field(name):
+        return property(
+            lambda self: getattr(self.disc, name) if self.disc else None,
+            doc='the view of Disc.{}'.format(name))
+
+    def _track_field(name, optional=False):
+        def view(self):
+            if self.disc is None:
+                return None
+            values = [getattr(track, name) for track in self.disc]
+            if optional and not any(values):
+                return None
+            return values
+        return property(view, doc='the view of Track.{}'.format(name))
+
+    art_a = _disc_field('artist')
+    album = _disc_field('album')
+    genre = _disc_field('genre')
+    d_id = _disc_field('disc_id')
+    year = _disc_field('year')
+    comm = _disc_field('comment')
+    comment = _disc_field('tag_comment')
+    title = _track_field('title')
+    artist = _track_field('artist')
+    track = _track_field('number')
+    tgenre = _track_field('genre', optional=True)
+    tdate = _track_field('date', optional=True)
+    del _disc_field, _track_field
+
+    @staticmethod
+    def _validate_metadata(meta):
+        for i in ('album', 'art_a', 'track', 'title'):
+            if not meta[i]:
+                raise InvalidCueError('this cuesheet is not valid')
+        if any(number not in meta['title'] for number in meta['track']):
             raise InvalidCueError('this cuesheet is not valid')
 
     def extract(self, source, noreturn=True):
@@ -48,28 +77,13 @@ class Cue(MetaData, Extractor):
         Extract data from 'source'.
         :param source: cuesheet file name
         :param noreturn: True or False
-        :return: cuesheet content or None
+        :return: parsed cuesheet or None
         """
-        content = self._get_content(source)
-        pats = self._pattern_data()
-        self.art_a = self.get_value(content, pats.art_a)
-        self.album = self.get_value(content, pats.album)
-        self.genre = self.get_value(content, pats.genre)
-        self.d_id = self.get_value(content, pats.d_id)
-        self.year = self.get_value(content, pats.year)
-        self.comm = self.get_value(content, pats.comm)
-        self.comment = (self.comm or 'cuetoolkit-' + version) + '/' +\
-                       (self.d_id or 'unknown disc')
-        self.title = self.get_values(content, pats.title)
-        self.artist = self.get_values(content, pats.artist)
-        self.track = self.get_values(content, pats.track)
-        if not self.artist and self.art_a:
-            self.artist = [self.art_a] * len(self.track)
-        self.tgenre = self.get_values(content, pats.tgenre) or None
-        self.tdate = self.get_values(content, pats.tdate) or None
-        self._validate_metadata()
+        sheet = self._get_sheet(source)
+        self._validate_metadata(sheet.meta)
+        self.disc = Disc.from_sheet(sheet.meta, sheet.store)
         if not noreturn:
-            return content
+            return sheet
         return None
 
 
@@ -78,7 +92,14 @@ class CDDAPoints(PointsData, Extractor):
     This is a cuesheet extractor, the main target for this class is cuesheet
     data containing indices. Only CDDA cuesheet.
     """
-    def __init__(self):
+    def __init__(self, strict=False, use_cache=True):
+        """
+        :param strict: True or False, check the file type with file(1)
+        :param use_cache: True or False, look for parsed cuesheets in the
+                          cache first
+        """
+        self.strict = strict
+        self.use_cache = use_cache
         self.store = None
 
     def extract(self, source):
@@ -87,8 +108,7 @@ class CDDAPoints(PointsData, Extractor):
         :param source: cuesheet file name
         :return: None
         """
-        content = self._get_content(source)
-        self.store = self._arrange_indices(content)
+        self.store = self._arrange_indices(self._get_sheet(source).store)
 
     def sift_points(self, schema):
         """
@@ -129,8 +149,8 @@ class CDDACue(Cue, CDDAPoints):
     """
     This is a CDDA cuesheet extractor, it extracts all data from cuesheet.
     """
-    def __init__(self):
-        Cue.__init__(self)
+    def __init__(self, strict=False, use_cache=True):
+        Cue.__init__(self, strict, use_cache)
         self.store = None
 
     def extract(self, source, noreturn=False):
@@ -142,8 +162,8 @@ class CDDACue(Cue, CDDAPoints):
         """
         if noreturn:
             raise ValueError('noreturn cannot be True')
-        content = Cue.extract(self, source, noreturn=noreturn)
-        self.store = self._arrange_indices(content)
+        sheet = Cue.extract(self, source, noreturn=noreturn)
+        self.store = self._arrange_indices(sheet.store)
 
 
 class NotCDDACue(NotCDDAPointsData, CDDACue):
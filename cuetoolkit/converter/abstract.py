@@ -8,35 +8,78 @@
 """
 
 
-import glob
+import collections
+import contextlib
+import errno
+import functools
+import hashlib
+import itertools
 import json
+import mmap
 import os
-import time
+import shlex
+import shutil
+import tempfile
+import threading
 
-from ..abstract import MediaSplitter, Encoder, LengthCounter, Rename
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import DEVNULL, PIPE, Popen
+
+from .. import version
+from ..abstract import (
+    MediaSplitter, Encoder, LengthCounter, Rename, WaveData)
+from ..cache import EncodeCache, SheetCache
 from ..common import Couple
+from ..deps import registry
 from ..mutagen.tagger import Tagger
-from ..exc import FileError, show_error
-from ..system import options_file
+from ..exc import FileError
+from ..system import init_cfg, options_file
+from ..timeline import Frames
+from .manifest import Manifest
+
+Target = collections.namedtuple(
+    'Target', ['media_type', 'output', 'work', 'encoder', 'tagger'])
 
 
-class Converter(MediaSplitter, Encoder, LengthCounter, Rename):
+class Converter(MediaSplitter, WaveData, Encoder, LengthCounter, Rename):
     """
     This is an abstract class, you do not want to create instances of this
     class because they will be able to do almost nothing. Nevertheless,
     I need this class as a super class to create other classes in cuetoolkit.
     """
-    def __init__(self, media_type, schema, quiet, prefix='track'):
+    # called with the name of every published track, e.g. by the daemon
+    progress = None
+    # the time unit of split points
+    timeline = Frames
+
+    def __init__(self, media_type, schema, quiet, prefix='track',
+                 output='.', scratch=None, encode_cache=False):
+        if isinstance(media_type, str):
+            media_type = [media_type]
         self.prefix = prefix
-        self.media_type = media_type
+        self.output = output
+        self.scratch = scratch
+        # a repeated media type would make two targets writing one file
+        self.media_types = list(collections.OrderedDict.fromkeys(media_type))
+        self.media_type = self.media_types[0]
         self.schema = schema
         self.quiet = quiet
+        # keep encoded tracks in the encode cache, only the own engine can
+        self.use_encode_cache = encode_cache
         self.tagger = Tagger()
         self.couple = Couple()
         self.cfg = None
-        self.template = None
         self.cue = None
-        self.cmd = None
+        self.encoder = None
+        self.enc_options = None
+        self.targets = list()
+        self.points = None
+        self.manifest = None
+        self.cache = None
+        # set from another thread to stop the conversion between pieces
+        self.cancelled = threading.Event()
+        # worker threads print whole lines one at a time
+        self.lock = threading.Lock()
 
     def _solve_options(self, enc_options):
         if enc_options and isinstance(enc_options, list):
@@ -47,10 +90,15 @@ class Converter(MediaSplitter, Encoder, LengthCounter, Rename):
         a_out, b_out = ' - -o %f"', ' - %f"'
         flac, ogg, mp3 = '', '-q 4', '--noreplaygain --lowpass -1 -V 0'
         parts = {each: dict() for each in ('flac', 'ogg', 'opus', 'mp3')}
-        parts['flac'].setdefault('cust', '"cust ext=flac flac ')
-        parts['ogg'].setdefault('cust', '"cust ext=ogg oggenc ')
-        parts['opus'].setdefault('cust', '"cust ext=opus opusenc ')
-        parts['mp3'].setdefault('cust', '"cust ext=mp3 lame ')
+        cust = '"cust ext={0} {1} '
+        parts['flac'].setdefault(
+            'cust', cust.format('flac', registry.locate('flac')))
+        parts['ogg'].setdefault(
+            'cust', cust.format('ogg', registry.locate('oggenc')))
+        parts['opus'].setdefault(
+            'cust', cust.format('opus', registry.locate('opusenc')))
+        parts['mp3'].setdefault(
+            'cust', cust.format('mp3', registry.locate('lame')))
         parts['flac'].setdefault('out', a_out)
         parts['ogg'].setdefault('out', a_out)
         parts['opus'].setdefault('out', b_out)
@@ -71,65 +119,602 @@ class Converter(MediaSplitter, Encoder, LengthCounter, Rename):
                 parts.get(media_type).get('enc'),
                 parts.get(media_type).get('out'))
 
-    def _gen_head(self, quiet):
+    def _gen_head(self, quiet, skip=()):
+        # shnsplit writes to the private directory once it is created
+        output = self.targets[0].work if self.targets else self.output
+        head = '"{0}" -d "{1}" -a {2} '.format(
+            registry.locate('shnsplit'), output, self.prefix)
+        skip = set(self._detect_junk()).union(skip)
+        if skip:
+            # extract only needed tracks, shnsplit keeps their numbers
+            pieces = range(1, len(self.cue.sift_points(self.schema)) + 2)
+            head += '-x {0} '.format(
+                ','.join(str(step) for step in pieces if step not in skip))
         if quiet:
-            return 'shnsplit -a {0} -q -o '.format(self.prefix)
-        return 'shnsplit -a {0} -o '.format(self.prefix)
+            return head + '-q -o '
+        return head + '-o '
 
-    def _gen_cmd(self, media_type, enc_options, quiet):
+    def _gen_cmd(self, media_type, enc_options, quiet, skip=()):
         e, opts, output = self._gen_parts(media_type)
         opts = enc_options or opts
-        return '{0}{1}{2}{3}'.format(self._gen_head(quiet), e, opts, output)
+        return '{0}{1}{2}{3}'.format(
+            self._gen_head(quiet, skip), e, opts, output)
+
+    def _gen_split(self, skip=()):
+        return '{0} "{1}"'.format(
+            self._gen_cmd(self.media_type, self.enc_options, self.quiet, skip),
+            self.couple.media)
+
+    def _gen_encoder(self, media_type, enc_options):
+        e, opts, output = self._gen_parts(media_type)
+        # reuse the shnsplit cust parts: drop 'cust ext=...' and the quotes
+        return (shlex.split(e.strip('"'))[2:] +
+                shlex.split(enc_options or opts) +
+                shlex.split(output.strip('"')))
+
+    def _gen_name(self, step, target):
+        return os.path.normpath(os.path.join(
+            target.work or target.output, '{0}{1}.{2}'.format(
+                self.prefix, str(step).zfill(2), target.media_type)))
+
+    def _gen_steps(self, points):
+        junk = self._detect_junk()
+        numbers = [number for number in range(1, len(points) + 2)
+                   if number not in junk]
+        return {number: step for step, number in enumerate(numbers)}
+
+    def _gen_bounds(self, number):
+        # the index range of the piece, None is the edge of the image
+        points = [None] + self.points + [None]
+        return points[number - 1:number + 1]
+
+    @staticmethod
+    def _gen_key(target, number):
+        return '{0}/{1}'.format(target.media_type, number)
+
+    def _gen_targets(self, enc_options):
+        if len(self.media_types) == 1:
+            outputs = [self.output]
+        else:
+            outputs = [os.path.join(self.output, media_type)
+                       for media_type in self.media_types]
+        targets = list()
+        for media_type, output in zip(self.media_types, outputs):
+            tagger = Tagger()
+            tagger.prepare(media_type)
+            targets.append(Target(
+                media_type, output, None,
+                self._gen_encoder(media_type, enc_options), tagger))
+        return targets
+
+    def _gen_work(self, work):
+        targets = list()
+        for target in self.targets:
+            path = work
+            if len(self.targets) > 1:
+                path = os.path.join(work, target.media_type)
+                os.mkdir(path)
+            targets.append(target._replace(work=path))
+        return targets
+
+    def _publish(self, name, target):
+        """
+        Move the finished track 'name' from the private directory to the
+        output directory, it appears there at once and whole.
+        """
+        dest = os.path.join(target.output, os.path.basename(name))
+        try:
+            return self._claim(name, dest)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+        # other file system, copy it near and claim the copy
+        fd, tmp = tempfile.mkstemp(prefix='.publish-', dir=target.output)
+        os.close(fd)
+        try:
+            shutil.copy2(name, tmp)
+            dest = self._claim(tmp, dest)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        os.remove(name)
+        return dest
+
+    def _claim(self, name, dest):
+        # a file which is not a track of this image is never replaced,
+        # e.g. a track of another image in the same output directory,
+        # the track takes the next free name instead
+        stem, extension = os.path.splitext(dest)
+        for attempt in itertools.count(1):
+            if attempt > 1:
+                dest = '{0}-{1}{2}'.format(stem, attempt, extension)
+            if self.manifest is None or self.manifest.owns(dest):
+                os.replace(name, dest)
+                return dest
+            if self._reserve(name, dest):
+                break
+        if attempt > 1:
+            self._report(
+                'warning:{0} exists, the track is saved as {1}'.format(
+                    os.path.basename(stem + extension),
+                    os.path.basename(dest)))
+        return dest
+
+    @staticmethod
+    def _reserve(name, dest):
+        # move 'name' to 'dest' only if 'dest' does not exist
+        try:
+            # unlike rename, a link fails if 'dest' exists
+            os.link(name, dest)
+        except FileExistsError:
+            return False
+        except OSError as e:
+            if e.errno == errno.EXDEV:
+                raise
+            # no hard links on this file system, take the name first
+            try:
+                open(dest, 'xb').close()
+            except FileExistsError:
+                return False
+            os.replace(name, dest)
+            return True
+        os.remove(name)
+        return True
+
+    def _count_samples(self, point, rate):
+        """
+        Count the samples of the image before 'point'.
+        :param point: string in format 'mm:ss.ff' or 'mm:ss.nnn',
+                      in units of 'timeline'
+        :param rate: integer, the sample rate of the image
+        :return: integer
+        """
+        return self.timeline.parse(point).to_samples(rate)
+
+    def _check_cancelled(self):
+        if self.cancelled.is_set():
+            raise RuntimeError('the conversion is cancelled')
 
-    def _detect_gaps(self):
+    def _detect_junk(self):
         junk = list()
         if self.schema == 'split':
             step = 1
             for key in sorted(self.cue.store):
                 if key == '01':
                     if self.cue.store[key][1]:
-                        junk.append('{0}{1}.{2}'.format(
-                            self.prefix,
-                            str(step).zfill(2),
-                            self.media_type))
+                        junk.append(step)
                         step += 1
                 else:
                     if self.cue.store[key][0]:
                         step += 1
-                        junk.append('{0}{1}.{2}'.format(
-                            self.prefix,
-                            str(step).zfill(2),
-                            self.media_type))
+                        junk.append(step)
                         step += 1
                     else:
                         step += 1
         return junk
 
-    def clean(self, thread, rename):
-        step = 0
-        files = sorted(glob.glob(self.template))
-        junk = self._detect_gaps()
-        while thread.is_alive():
-            time.sleep(0.1)
-            if junk:
-                self.remove_gaps(junk)
-            if len(files) < len(sorted(glob.glob(self.template))):
-                files = sorted(glob.glob(self.template))
-                if len(files) >= 2:
-                    self.tagger.write_meta(files[-2], step, self.cue)
-                    if rename:
-                        self.rename_file(files[-2], step, self.cue)
-                    files = sorted(glob.glob(self.template))
-                    step += 1
-        if files:
-            self.tagger.write_meta(files[-1], step, self.cue)
-            if rename:
-                self.rename_file(files[-1], step, self.cue)
+    def _finish_piece(self, number, step, target, rename):
+        target.tagger.write_meta(
+            self._gen_name(number, target), step, self.cue.disc)
+        return self._settle_piece(number, step, target, rename)
+
+    def _settle_piece(self, number, step, target, rename):
+        # the tagged piece is renamed, published and recorded
+        name = self._gen_name(number, target)
+        if rename:
+            name = self.rename_file(name, step, self.cue.disc) or name
+        if target.work:
+            name = self._publish(name, target)
+        if self.manifest:
+            self.manifest.record(
+                self._gen_key(target, number), self._gen_bounds(number),
+                target.encoder, name)
+        if self.progress:
+            self.progress(name)
+        return name
+
+    def _stage_pieces(self, points, junk, tmp, limit):
+        cmd = self.get_decode_cmd(self.couple.media)
+        if cmd is None:
+            p, stream = None, open(self.couple.media, 'rb')
+        else:
+            p = Popen(cmd, stdout=PIPE, stderr=DEVNULL)
+            stream = p.stdout
+        try:
+            wave = self.read_wave_header(stream)
+            bounds = [self._count_samples(point, wave.rate) * wave.block
+                      for point in points]
+            bounds.append(wave.size)
+            position = 0
+            for number, bound in enumerate(bounds, 1):
+                size = None if bound is None else bound - position
+                if number in junk:
+                    # read the range through, it must not reach encoders
+                    copied = self.copy_pcm(stream, size)
+                    if size is not None and copied != size:
+                        raise RuntimeError(
+                            'looks like media file is not valid')
+                    position += copied
+                    continue
+                path = os.path.join(tmp, '{0}.wav'.format(number))
+                md5 = self._new_digest(wave) if self.cache else None
+                sinks = (md5.update, ) if md5 else ()
+                self._check_cancelled()
+                limit.acquire()
+                with open(path, 'wb') as f:
+                    f.write(self.gen_wave_header(wave, 0))
+                    copied = self.copy_pcm(stream, size, f.write, *sinks)
+                    f.seek(0)
+                    f.write(self.gen_wave_header(wave, copied))
+                if size is not None and copied != size:
+                    raise RuntimeError('looks like media file is not valid')
+                position += copied
+                yield (number, functools.partial(self._feed_file, path),
+                       md5.hexdigest if md5 else None)
+            while stream.read(self.chunk):
+                pass
+        finally:
+            stream.close()
+            if p:
+                p.wait()
+        if p and p.returncode:
+            raise RuntimeError('looks like media file is not valid')
+
+    def _map_pieces(self, points, junk, wave, data, limit):
+        end = len(data) if wave.size is None else wave.size
+        if end > len(data):
+            raise RuntimeError('looks like media file is not valid')
+        bounds = [self._count_samples(point, wave.rate) * wave.block
+                  for point in points]
+        bounds.append(end)
+        position = 0
+        for number, bound in enumerate(bounds, 1):
+            if bound < position or bound > end:
+                raise RuntimeError('media file is too short for this cuesheet')
+            if number in junk:
+                position = bound
+                continue
+            self._check_cancelled()
+            limit.acquire()
+            piece = data[position:bound]
+            yield (number, functools.partial(self._feed_slice, wave, piece),
+                   functools.partial(self._hash_slice, wave, piece)
+                   if self.cache else None)
+            position = bound
+
+    def _seek_pieces(self, points, junk, wave, limit):
+        bounds = [self._count_samples(point, wave.rate) for point in points]
+        bounds.append(wave.size // wave.block)
+        position = 0
+        for number, bound in enumerate(bounds, 1):
+            if bound < position:
+                raise RuntimeError('media file is too short for this cuesheet')
+            if number in junk:
+                position = bound
+                continue
+            self._check_cancelled()
+            limit.acquire()
+            # the audio data is not known before it is encoded, so these
+            # pieces are not looked up in the encode cache
+            yield number, functools.partial(
+                self._feed_decoder,
+                self.get_seek_cmd(self.couple.media, position, bound),
+                wave, (bound - position) * wave.block), None
+            position = bound
+
+    @staticmethod
+    def _new_digest(wave):
+        return hashlib.md5('{0}/{1}/{2}'.format(
+            wave.channels, wave.rate, wave.bits).encode('utf-8'))
+
+    def _hash_slice(self, wave, piece):
+        md5 = self._new_digest(wave)
+        md5.update(piece)
+        return md5.hexdigest()
+
+    @staticmethod
+    def _start_encoders(cmds):
+        encoders = list()
+        try:
+            for cmd in cmds:
+                encoders.append(
+                    Popen(cmd, stdin=PIPE, stdout=DEVNULL, stderr=DEVNULL))
+        except OSError:
+            Converter._stop_encoders(encoders)
+            raise
+        return encoders
+
+    @staticmethod
+    def _write_encoders(encoders, data):
+        for p in encoders:
+            if p.stdin.closed:
+                continue
+            try:
+                p.stdin.write(data)
+            except BrokenPipeError:
+                # the encoder has gone, its return code tells the rest
+                Converter._close_stdin(p)
+
+    @staticmethod
+    def _close_stdin(p):
+        try:
+            p.stdin.close()
+        except BrokenPipeError:
+            pass
+
+    @staticmethod
+    def _stop_encoders(encoders):
+        for p in encoders:
+            Converter._close_stdin(p)
+        return [p.wait() for p in encoders]
+
+    def _feed_file(self, path, cmds):
+        try:
+            encoders = self._start_encoders(cmds)
+            try:
+                if encoders:
+                    with open(path, 'rb') as f:
+                        self.copy_pcm(f, None, functools.partial(
+                            self._write_encoders, encoders))
+            finally:
+                returncodes = self._stop_encoders(encoders)
+        finally:
+            os.remove(path)
+        return returncodes
+
+    def _feed_slice(self, wave, piece, cmds):
+        try:
+            encoders = self._start_encoders(cmds)
+            try:
+                self._write_encoders(
+                    encoders, self.gen_wave_header(wave, len(piece)))
+                self._write_encoders(encoders, piece)
+            finally:
+                returncodes = self._stop_encoders(encoders)
+        finally:
+            piece.release()
+        return returncodes
+
+    def _feed_decoder(self, decode, wave, size, cmds):
+        if not cmds:
+            # nothing is encoded, the track is not decoded either
+            return []
+        copied, extra = None, None
+        encoders = self._start_encoders(cmds)
+        try:
+            with Popen(decode, stdout=PIPE, stderr=DEVNULL) as d:
+                try:
+                    if self.read_wave_header(d.stdout)[:4] != wave[:4]:
+                        raise RuntimeError(
+                            'looks like media file is not valid')
+                    sink = functools.partial(self._write_encoders, encoders)
+                    sink(self.gen_wave_header(wave, size))
+                    copied = self.copy_pcm(d.stdout, size, sink)
+                    extra = d.stdout.read(1)
+                finally:
+                    d.stdout.close()
+        finally:
+            returncodes = self._stop_encoders(encoders)
+        # the decoded range must be exactly the range of the track
+        if d.returncode or copied != size or extra:
+            raise RuntimeError('the decoded track is not sample exact')
+        return returncodes
+
+    def _encode_piece(self, feed, digest, number, step, rename, limit):
+        names = [self._gen_name(number, target) for target in self.targets]
+        cmds = [[name if arg == '%f' else arg for arg in target.encoder]
+                for name, target in zip(names, self.targets)]
+        keys = [None] * len(self.targets)
+        missing = range(len(self.targets))
+        cancelled = self.cancelled.is_set()
+        try:
+            if cancelled:
+                # the feed only releases its audio data
+                missing = ()
+            elif digest:
+                digest = digest()
+                keys = [self.cache.gen_key(
+                    digest, target.media_type, target.encoder)
+                    for target in self.targets]
+                missing = [i for i in missing
+                           if not self.cache.fetch(keys[i], names[i])]
+            # the feed releases its audio data even if nothing is encoded
+            returncodes = feed([cmds[i] for i in missing])
+        finally:
+            limit.release()
+        if cancelled:
+            raise RuntimeError('the conversion is cancelled')
+        for i, returncode in zip(missing, returncodes):
+            if returncode:
+                raise RuntimeError('{0} cannot be encoded'.format(names[i]))
+            if keys[i]:
+                self.cache.put(keys[i], names[i])
+        for target in self.targets:
+            name = self._finish_piece(number, step, target, rename)
+            if not self.quiet:
+                self._report('{0}  done'.format(name))
+
+    def _report(self, line):
+        with self.lock:
+            print(line, flush=True)
+
+    def _run_pieces(self, pieces, steps, jobs, rename, limit):
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            tasks = [pool.submit(self._encode_piece, feed, digest,
+                                 number, steps[number], rename, limit)
+                     for number, feed, digest in pieces]
+            for task in tasks:
+                task.result()
+
+    def split_tracks(self, points, jobs, rename, seek=False, skip=()):
+        """
+        Decode the media file once and encode its tracks concurrently, every
+        finished track is tagged (and renamed) as soon as its encoder exits.
+        Pregaps the 'split' schema does not keep are never encoded.
+        WAVE images are not decoded at all, they are mapped into memory and
+        their slices are written straight to encoders.
+        :param points: list containing strings in format 'mm:ss.ff'
+                       or 'mm:ss.nnn'
+        :param jobs: integer, the maximum amount of running encoders
+        :param rename: True or False
+        :param seek: True to decode every track of a FLAC or WavPack image
+                     by its own decoder seeking to the track's range
+        :param skip: numbers of pieces which are not needed
+        :return: None
+        """
+        # do not let the decoder run too far ahead of the encoders
+        limit = threading.BoundedSemaphore(jobs * 2)
+        junk = set(self._detect_junk()).union(skip)
+        steps = self._gen_steps(points)
+        media = self.couple.media
+        wave = self.read_header(media) if seek else None
+        if wave and self.get_seek_cmd(media, 0, 0):
+            # every piece runs its own decoder, no one has to wait
+            limit = threading.BoundedSemaphore(jobs)
+            self._run_pieces(
+                self._seek_pieces(points, junk, wave, limit),
+                steps, jobs, rename, limit)
+            return
+        if self.get_decode_cmd(media) is not None:
+            tmp = tempfile.mkdtemp(
+                prefix='.stage-', dir=self.targets[0].work or self.output)
+            try:
+                self._run_pieces(
+                    self._stage_pieces(points, junk, tmp, limit),
+                    steps, jobs, rename, limit)
+            finally:
+                shutil.rmtree(tmp, ignore_errors=True)
+            return
+        with open(media, 'rb') as f:
+            wave = self.read_wave_header(f)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                data = memoryview(mm)[f.tell():]
+                try:
+                    self._run_pieces(
+                        self._map_pieces(points, junk, wave, data, limit),
+                        steps, jobs, rename, limit)
+                finally:
+                    data.release()
 
     def _validate_image(self):
         pass
 
+    def _gen_head_info(self, rename):
+        media = os.stat(self.couple.media)
+        return {'version': version,
+                'media': [self.couple.media, media.st_mtime_ns,
+                          media.st_size],
+                'cue': SheetCache.gen_key(self.couple.cue),
+                'schema': self.schema,
+                'prefix': self.prefix,
+                'rename': rename}
+
+    def _check_done(self):
+        done = set()
+        for number in self._gen_steps(self.points):
+            if all(self.manifest.check(
+                    self._gen_key(target, number), self._gen_bounds(number),
+                    target.encoder) for target in self.targets):
+                done.add(number)
+        return done
+
+    def convert(self, rename, jobs=None, seek=False):
+        """
+        Split the checked image to tracks in the output directory. Tracks
+        are made in a private directory, every finished track is moved to
+        the output directory at once, a file which is not a track of this
+        image is never replaced. Finished tracks are recorded in the
+        manifest of the image in the output directory, tracks recorded by
+        an interrupted run are not encoded again. The own engine stops
+        between pieces once 'cancelled' is set.
+        :param rename: True or False
+        :param jobs: None to split with shnsplit where it is needed, see
+                     Converter.uses_shnsplit, or the maximum amount of
+                     running pieces, 0 means the number of CPUs
+        :param seek: True or False, see Converter.split_tracks
+        :return: None
+        """
+        done = self._prepare(rename)
+        if done is None:
+            return
+        if self.use_encode_cache:
+            self.cache = EncodeCache()
+        if jobs is None and not self.uses_shnsplit(jobs, seek):
+            jobs = 0
+        with self._private():
+            self._split(rename, jobs, seek, done)
+
+    def uses_shnsplit(self, jobs, seek):
+        """
+        Check if convert splits the image with shnsplit. shnsplit runs
+        a single encoder, so several media types, seeking, the encode cache
+        and a 'jobs' value need the own engine, and WAVE images are always
+        cut through mmap by the own engine.
+        :param jobs: None or integer, see Converter.convert
+        :param seek: True or False
+        :return: True or False
+        """
+        return jobs is None and len(self.targets) == 1 and not seek and \
+            not self.use_encode_cache and \
+            self.get_decode_cmd(self.couple.media) is not None
+
+    def _prepare(self, rename):
+        # the numbers of finished pieces, None if nothing is left to do
+        for target in self.targets:
+            try:
+                os.makedirs(target.output, exist_ok=True)
+            except OSError:
+                raise FileError('unable to create {0}'.format(target.output))
+        self.points = self.cue.sift_points(self.schema)
+        self.manifest = Manifest(
+            self.output, self.couple.cue, self._gen_head_info(rename))
+        self.manifest.load()
+        done = self._check_done()
+        if not set(self._gen_steps(self.points)) - done:
+            return None
+        return done
+
+    @contextlib.contextmanager
+    def _private(self):
+        try:
+            work = tempfile.mkdtemp(
+                prefix='.cuetoolkit-', dir=self.scratch or self.output)
+        except OSError:
+            raise FileError('unable to create the private directory')
+        targets = self.targets
+        try:
+            self.targets = self._gen_work(work)
+            yield work
+        finally:
+            self.targets = targets
+            shutil.rmtree(work, ignore_errors=True)
+
+    def _split(self, rename, jobs, seek, done):
+        if jobs is not None:
+            self.split_tracks(self.points, jobs or os.cpu_count() or 1,
+                              rename, seek, done)
+            return
+        # shnsplit and the tagging of its pieces are driven by one loop
+        import asyncio
+        from .. import aio
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        task = loop.create_task(aio.split_image(self, rename, done))
+        try:
+            loop.run_until_complete(task)
+        except BaseException:
+            # shnsplit has its own process group, Ctrl+C does not reach it,
+            # so it is killed by the cancelled task
+            task.cancel()
+            loop.run_until_complete(asyncio.wait([task]))
+            raise
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
     def check_data(self, source, enc_options):
+        init_cfg()
         self.cfg = self.read_cfg(options_file)
         enc_options = self._solve_options(enc_options)
         self.couple.couple(source)
@@ -138,14 +723,17 @@ class Converter(MediaSplitter, Encoder, LengthCounter, Rename):
         if self.couple.media is None:
             raise FileError('there is no media file')
         self._check_decoder(self.couple.media)
-        self._check_encoder(self.media_type)
-        self.template = '{0}*.{1}'.format(self.prefix, self.media_type)
+        for media_type in self.media_types:
+            self._check_encoder(media_type)
+        if enc_options and len(self.media_types) > 1:
+            raise ValueError(
+                'encoder options cannot be shared by several media types')
         self.cue.extract(self.couple.cue)
         self._validate_image()
-        self.cmd = '{0} "{1}"'.format(
-            self._gen_cmd(self.media_type, enc_options, self.quiet),
-            self.couple.media)
-        self.tagger.prepare(self.media_type)
+        self.enc_options = enc_options
+        self.targets = self._gen_targets(enc_options)
+        self.encoder = self.targets[0].encoder
+        self.tagger = self.targets[0].tagger
 
     @staticmethod
     def read_cfg(conf_file):
@@ -155,22 +743,3 @@ class Converter(MediaSplitter, Encoder, LengthCounter, Rename):
         except (OSError, ValueError):
             print('warning:unable to read predefined options')
             return None
-
-    @staticmethod
-    def clean_cwd(template):
-        junk = glob.glob(template)
-        if junk:
-            for item in junk:
-                try:
-                    os.remove(item)
-                except OSError:
-                    show_error('current working directory is not writable')
-
-    @staticmethod
-    def remove_gaps(junk):
-        for gap in junk:
-            if gap in os.listdir('.'):
-                try:
-                    os.remove(gap)
-                except OSError:
-                    show_error('cannot remove {0}'.format(gap))
@@ -0,0 +1,152 @@
+"""
+    cuetoolkit.converter.batch
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    BatchConverter walks a directory tree, couples every found cuesheet
+    with its media file and splits the images to tracks in a pool of
+    processes, each image gets its own output directory.
+"""
+
+
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+
+from ..common import Couple
+from ..deps import registry, tools
+from ..system import init_cfg
+from .convert import CDDAConverter, NotCDDAConverter
+
+
+def convert_image(cue, output, media_type, schema, not_cdda,
+                  enc_options, rename, jobs, seek=False, scratch=None,
+                  options=None):
+    """
+    Split one image to tracks, this function is being run in the
+    subprocess of the pool.
+    :param options: None or dict of keyword arguments of the converter:
+                    'strict', 'use_cache' and 'encode_cache'
+    :return: tuple (error message or None, cuesheet encoding, confidence)
+    """
+    cls = NotCDDAConverter if not_cdda else CDDAConverter
+    image = cls(media_type, schema, True, output=output, scratch=scratch,
+                **(options or dict()))
+    try:
+        image.check_data(cue, enc_options)
+        image.convert(rename, jobs, seek)
+    except SystemExit:
+        error = 'the image cannot be processed'
+    except Exception as e:
+        error = str(e) or e.__class__.__name__
+    else:
+        error = None
+    return error, image.cue.encoding, image.cue.confidence
+
+
+class BatchConverter:
+    """
+    This can split to tracks all images found in a directory tree.
+    """
+    def __init__(self, media_type, schema, not_cdda, quiet, scratch=None,
+                 strict=False, use_cache=True, encode_cache=False):
+        """
+        :param media_type: one of these: 'flac', 'ogg', 'opus' or 'mp3',
+                           or a list of them
+        :param schema: 'append', 'prepend' or 'split'
+        :param not_cdda: True or False
+        :param quiet: True or False
+        :param scratch: None or the directory for private directories
+                        of images
+        :param strict: True or False, check the file type with file(1)
+        :param use_cache: True or False, look for parsed cuesheets in the
+                          cache first
+        :param encode_cache: True or False, see Converter.convert
+        """
+        self.media_type = media_type
+        self.scratch = scratch
+        self.schema = schema
+        self.not_cdda = not_cdda
+        self.quiet = quiet
+        self.options = {'strict': strict,
+                        'use_cache': use_cache,
+                        'encode_cache': encode_cache}
+        self.images = list()
+        self.results = dict()
+
+    def scan(self, root, target):
+        """
+        Find images in the 'root' tree, tracks of every image will be saved
+        in 'target' in the directory repeating the image's relative path.
+        :param root: string (directory name)
+        :param target: string (directory name)
+        :return: None
+        """
+        if not os.path.isdir(root):
+            raise NotADirectoryError('"{}" is not a directory'.format(root))
+        for home, dirs, files in os.walk(root):
+            dirs.sort()
+            for item in sorted(files):
+                name, ext = os.path.splitext(item)
+                if ext != '.cue':
+                    continue
+                source = os.path.join(home, item)
+                couple = Couple()
+                couple.couple(source)
+                output = os.path.join(
+                    target, os.path.relpath(home, root), name)
+                self.images.append(
+                    (source, couple.media, os.path.normpath(output)))
+
+    def run(self, enc_options, rename, processes, jobs=None, seek=False):
+        """
+        Split found images in a pool of 'processes'.
+        :param enc_options: list of encoder options or None
+        :param rename: True or False
+        :param processes: integer, the size of the pool
+        :param jobs: None or integer, see Converter.convert
+        :param seek: True or False, see Converter.split_tracks
+        :return: None
+        """
+        # write the default options and resolve applications before
+        # the pool forks its processes
+        init_cfg()
+        for name in tools + ('shnsplit', 'shnlen', 'shnhash'):
+            registry.resolve(name)
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            tasks = dict()
+            for source, media, output in self.images:
+                if media is None:
+                    self.results[source] = (
+                        'there is no media file', None, None)
+                    continue
+                tasks[source] = pool.submit(
+                    convert_image, os.path.realpath(source),
+                    os.path.realpath(output), self.media_type, self.schema,
+                    self.not_cdda, enc_options, rename, jobs, seek,
+                    self.scratch and os.path.realpath(self.scratch),
+                    self.options)
+            for source in tasks:
+                self.results[source] = tasks[source].result()
+                if not self.quiet:
+                    print('{0}:{1}'.format(
+                        source,
+                        'failed' if self.results[source][0] else 'done'))
+
+    def pprint(self):
+        """
+        Print the summary on the screen.
+        :return: None
+        """
+        if not self.images:
+            print('no cuesheets found')
+            return
+        block = max(len(source) for source, _, _ in self.images) + 2
+        for source, _, _ in self.images:
+            error, enc, confidence = self.results[source]
+            if enc:
+                enc = ' ({0}, {1:.2f})'.format(enc, confidence)
+            print('{0:<{2}}{1}{3}'.format(
+                source, error or 'ok', block, enc or ''))
+        failed = len([i for i in self.results.values() if i[0]])
+        print('{0} images, {1} done, {2} failed'.format(
+            len(self.images), len(self.images) - failed, failed))
@@ -9,18 +9,23 @@
 
 from ..common import CDDACue, NotCDDACue
 from ..exc import FileError
+from ..timeline import Frames, Millis
 from .abstract import Converter
 
 
 class CDDAConverter(Converter):
-    def __init__(self, media_type, schema, quiet, prefix='track'):
-        Converter.__init__(self, media_type, schema, quiet, prefix)
-        self.cue = CDDACue()
+    def __init__(self, media_type, schema, quiet, prefix='track',
+                 output='.', scratch=None, strict=False, use_cache=True,
+                 encode_cache=False):
+        Converter.__init__(
+            self, media_type, schema, quiet, prefix, output, scratch,
+            encode_cache)
+        self.cue = CDDACue(strict, use_cache)
 
     def _validate_image(self):
         length, cdda = self._count_length(self.couple.media)
-        last_index = self.convert_to_number(self.cue.sift_points('append')[-1])
-        if length - last_index < 2:
+        last_index = Frames.parse(self.cue.sift_points('append')[-1])
+        if length.to(Frames) - last_index < 2 * Frames.scale:
             raise FileError('media file is too short for this cuesheet')
         if cdda != 'CDDA':
             raise FileError(
@@ -28,14 +33,20 @@ class CDDAConverter(Converter):
 
 
 class NotCDDAConverter(Converter):
-    def __init__(self, media_type, schema, quiet, prefix='track'):
-        Converter.__init__(self, media_type, schema, quiet, prefix)
-        self.cue = NotCDDACue()
+    timeline = Millis
+
+    def __init__(self, media_type, schema, quiet, prefix='track',
+                 output='.', scratch=None, strict=False, use_cache=True,
+                 encode_cache=False):
+        Converter.__init__(
+            self, media_type, schema, quiet, prefix, output, scratch,
+            encode_cache)
+        self.cue = NotCDDACue(strict, use_cache)
 
     def _validate_image(self):
         length, cdda = self._count_length(self.couple.media)
-        last_index = self.convert_to_seconds(self.cue.sift_points('append')[-1])
-        if length - last_index < 2:
+        last_index = Millis.parse(self.cue.sift_points('append')[-1])
+        if length.to(Millis) - last_index < 2 * Millis.scale:
             raise FileError('media file is too short for this cuesheet')
         if cdda == 'CDDA':
             raise FileError(
@@ -0,0 +1,154 @@
+"""
+    cuetoolkit.converter.manifest
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Manifest records every finished track of an image in the output
+    directory: its index range, encoder command, file name, size and
+    checksum. An interrupted conversion is resumed from it, tracks which
+    are recorded and still valid are not encoded again. Every image has
+    its own manifest, so several images may share the output directory.
+    File names are kept relative to the manifest, so a conversion may be
+    resumed from any working directory.
+"""
+
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+
+class Manifest:
+    """
+    This can record finished tracks and check them on the next run.
+    """
+    def __init__(self, directory, cue, head):
+        """
+        :param directory: the output directory
+        :param cue: the cuesheet file name of the image
+        :param head: dict describing the conversion, the recorded tracks
+                     are valid only for the same head
+        """
+        self.path = os.path.join(directory, self.gen_name(cue))
+        self.home = os.path.dirname(self.path) or '.'
+        self.head = head
+        self.tracks = dict()
+        self.owned = set()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def gen_name(cue):
+        """
+        Generate the manifest file name of the image of 'cue'.
+        :param cue: string (file name)
+        :return: string
+        """
+        path = os.path.realpath(cue)
+        return '.{0}-{1}.cuetoolkit.json'.format(
+            os.path.splitext(os.path.basename(path))[0],
+            hashlib.sha1(path.encode('utf-8')).hexdigest()[:8])
+
+    def load(self):
+        """
+        Read the recorded tracks, tracks of another conversion of the image
+        are not resumed, but their files still belong to the image.
+        :return: None
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or \
+                not isinstance(data.get('tracks'), dict):
+            return
+        for entry in data['tracks'].values():
+            if isinstance(entry, dict) and \
+                    isinstance(entry.get('output'), str):
+                self.owned.add(self._resolve(entry['output']))
+        if data.get('head') == self.head:
+            self.tracks = data['tracks']
+
+    def _resolve(self, output):
+        # the recorded file name is relative to the manifest
+        return os.path.realpath(os.path.join(self.home, output))
+
+    def owns(self, name):
+        """
+        Check if the file 'name' is a track of the image.
+        :param name: string (file name)
+        :return: True or False
+        """
+        return os.path.realpath(name) in self.owned
+
+    def save(self):
+        """
+        Write the manifest atomically.
+        :return: None
+        """
+        fd, tmp = tempfile.mkstemp(prefix='.manifest-', dir=self.home)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'head': self.head, 'tracks': self.tracks}, f,
+                          ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @staticmethod
+    def checksum(name):
+        """
+        Count md5 of the file 'name'.
+        :param name: string
+        :return: string (hex digest)
+        """
+        md5 = hashlib.md5()
+        with open(name, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                md5.update(chunk)
+        return md5.hexdigest()
+
+    def check(self, key, bounds, command):
+        """
+        Find the file of the recorded track 'key' if it is still valid.
+        :param key: string
+        :param bounds: list [start, end] of the track's index range
+        :param command: list, the encoder command
+        :return: string (file name) or None
+        """
+        entry = self.tracks.get(key)
+        if not entry or entry.get('range') != bounds or \
+                entry.get('command') != command:
+            return None
+        try:
+            output = self._resolve(entry.get('output'))
+            if os.path.getsize(output) != entry.get('size') or \
+                    self.checksum(output) != entry.get('md5'):
+                return None
+        except (OSError, TypeError):
+            return None
+        return output
+
+    def record(self, key, bounds, command, output):
+        """
+        Record the finished track 'key' and save the manifest.
+        :param key: string
+        :param bounds: list [start, end] of the track's index range
+        :param command: list, the encoder command
+        :param output: string, the final file name of the track
+        :return: None
+        """
+        path = os.path.realpath(output)
+        entry = {'range': bounds,
+                 'command': command,
+                 'output': os.path.relpath(
+                     path, os.path.realpath(self.home)),
+                 'size': os.path.getsize(output),
+                 'md5': self.checksum(output)}
+        with self.lock:
+            self.tracks[key] = entry
+            self.owned.add(path)
+            self.save()
@@ -0,0 +1,62 @@
+"""
+    cuetoolkit.converter.watch
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Watcher reports files of a directory the moment they are closed after
+    writing. It uses inotify, so it is available only on Linux, on other
+    systems its constructor raises OSError.
+"""
+
+
+import ctypes
+import os
+import select
+import struct
+
+IN_CLOSE_WRITE = 0x00000008
+IN_CLOEXEC = 0o2000000
+
+
+class Watcher:
+    """
+    This can watch a directory for files closed after writing.
+    """
+    def __init__(self, directory):
+        """
+        :param directory: the watched directory
+        """
+        try:
+            # the symbols of the interpreter process, libc included
+            libc = ctypes.CDLL(None, use_errno=True)
+            init, add_watch = libc.inotify_init1, libc.inotify_add_watch
+        except (OSError, AttributeError):
+            raise OSError('inotify is not available')
+        self.fd = init(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify cannot be started')
+        if add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, 'inotify cannot watch {}'.format(directory))
+
+    def read(self, timeout):
+        """
+        Wait up to 'timeout' seconds for closed files.
+        :param timeout: float
+        :return: list containing base names of closed files
+        """
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return list()
+        data, names, offset = os.read(self.fd, 1 << 16), list(), 0
+        while offset < len(data):
+            # struct inotify_event: int wd; uint32 mask, cookie, len
+            _, _, _, length = struct.unpack_from('iIII', data, offset)
+            offset += 16
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
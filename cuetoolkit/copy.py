@@ -19,13 +19,15 @@ class CopyCue(Reader, Writer):
     """
     This can copy cuesheet data from one file to another.
     """
-    def __init__(self, name, lang):
+    def __init__(self, name, lang, strict=False):
         """
         there is only one language currently available - 'ru'
         :param name: cuesheet file name
         :param lang: 'ru'
+        :param strict: True or False, check the file type with file(1)
         """
         choices = {'ru': rus, }
+        self.strict = strict
         self.source = name
         self.trans = choices.get(lang)
         self.content = None
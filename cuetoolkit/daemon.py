@@ -0,0 +1,247 @@
+"""
+    cuetoolkit.daemon
+    ~~~~~~~~~~~~~~~~~
+
+    Server keeps a warm process and runs split, report and tag jobs it
+    takes over a Unix socket, so a client does not pay for the interpreter
+    startup, imports and configuration on every image. A request is one
+    line of JSON: {"command": "split", "args": {...}}. The server answers
+    with a stream of JSON events, one per line, the last one is 'done'
+    or 'error'.
+"""
+
+
+import asyncio
+import json
+import os
+import signal
+import socket
+
+from concurrent.futures import ThreadPoolExecutor
+
+from . import aio
+from .converter.convert import CDDAConverter, NotCDDAConverter
+from .report import Reporter
+from .system import init_cfg
+from .tagger import TagWriter
+
+
+class Output:
+    """
+    This is a file object turning every printed line into an event.
+    """
+    def __init__(self, emit):
+        self.emit = emit
+        self.buf = ''
+
+    def write(self, text):
+        lines = (self.buf + text).split('\n')
+        self.buf = lines.pop()
+        for line in lines:
+            self.emit({'event': 'output', 'text': line})
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class Server:
+    """
+    This can serve jobs of clients on a Unix socket.
+    """
+    def __init__(self, path, workers=None, strict=False, use_cache=True):
+        """
+        :param path: the socket file name
+        :param workers: the number of jobs running at a time, the number
+                        of CPUs if None
+        :param strict: True or False, check the file type of cuesheets
+                       with file(1) in every job
+        :param use_cache: True or False, look for parsed cuesheets in the
+                          cache first in every job
+        """
+        self.path = path
+        self.strict = strict
+        self.use_cache = use_cache
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ThreadPoolExecutor(max_workers=self.workers)
+        self.slots = None
+        self.jobs = set()
+        self.commands = {'split': self.split,
+                         'report': self.report,
+                         'tag': self.tag}
+
+    def _check_socket(self):
+        if not os.path.exists(self.path):
+            return
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            try:
+                s.connect(self.path)
+            except OSError:
+                # a stale socket of a daemon which is gone
+                os.remove(self.path)
+                return
+        raise RuntimeError('the daemon is already running')
+
+    def serve(self):
+        """
+        Serve clients until the process is interrupted or terminated.
+        :return: None
+        """
+        init_cfg()
+        self._check_socket()
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.slots = asyncio.Semaphore(self.workers)
+        server = loop.run_until_complete(
+            asyncio.start_unix_server(self.handle, path=self.path))
+        os.chmod(self.path, 0o600)
+        # processes of jobs have their own sessions, SIGTERM does not
+        # reach them, so it stops the daemon the way Ctrl+C does
+        loop.add_signal_handler(signal.SIGTERM, loop.stop)
+        try:
+            loop.run_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            loop.remove_signal_handler(signal.SIGTERM)
+            # the processes of running jobs are killed, their threads
+            # are waited for
+            for job in self.jobs:
+                job.cancel()
+            if self.jobs:
+                loop.run_until_complete(asyncio.wait(self.jobs))
+            server.close()
+            loop.run_until_complete(server.wait_closed())
+            os.remove(self.path)
+            self.pool.shutdown()
+            asyncio.set_event_loop(None)
+            loop.close()
+
+    async def handle(self, reader, writer):
+        """
+        Take one request of a client and stream events of its job back.
+        The job is cancelled if the client goes away.
+        """
+        loop = asyncio.get_event_loop()
+        queue = asyncio.Queue()
+
+        def emit(event):
+            # jobs emit events from worker threads too
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+        try:
+            request = json.loads((await reader.readline()).decode('utf-8'))
+            command = self.commands[request['command']]
+            args = request.get('args') or dict()
+        except (ValueError, KeyError, TypeError, AttributeError):
+            emit({'event': 'error', 'message': 'invalid request'})
+            command, args = None, None
+        job = asyncio.ensure_future(self.run(command, args, emit))
+        self.jobs.add(job)
+        job.add_done_callback(self.jobs.discard)
+        job.add_done_callback(lambda _: emit(None))
+        # the client sends nothing more, it closes the connection only
+        # when it goes away
+        gone = asyncio.ensure_future(reader.read())
+        gone.add_done_callback(lambda _: job.cancel())
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                writer.write(json.dumps(event).encode('utf-8') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            job.cancel()
+        finally:
+            gone.cancel()
+            writer.close()
+
+    async def run(self, command, args, emit):
+        """
+        Run a job when one of the worker slots is free.
+        :param command: coroutine function taking 'args' and 'emit'
+        :param args: dict
+        :param emit: function sending an event to the client
+        :return: None
+        """
+        if command is None:
+            return
+        emit({'event': 'queued'})
+        async with self.slots:
+            emit({'event': 'started'})
+            try:
+                await command(args, emit)
+            except asyncio.CancelledError:
+                raise
+            except SystemExit:
+                emit({'event': 'error',
+                      'message': 'the job cannot be processed'})
+                return
+            except Exception as e:
+                emit({'event': 'error',
+                      'message': str(e) or e.__class__.__name__})
+                return
+        emit({'event': 'done'})
+
+    async def _execute(self, func, *args, cancelled=None):
+        # a thread cannot be cancelled, the job keeps its slot until the
+        # thread is done, 'cancelled' asks it to stop
+        future = asyncio.get_event_loop().run_in_executor(
+            self.pool, func, *args)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if cancelled:
+                cancelled.set()
+            await asyncio.wait([future])
+            raise
+
+    async def split(self, args, emit):
+        """
+        Split an image to tracks, see cue2tracks for the arguments.
+        Every published track is reported by a 'track' event.
+        """
+        if args.get('not_cdda'):
+            cls = NotCDDAConverter
+        else:
+            cls = CDDAConverter
+        image = cls(args.get('media_type') or ['flac'],
+                    args.get('gaps') or 'append', True,
+                    output=args.get('output') or '.',
+                    scratch=args.get('scratch'), strict=self.strict,
+                    use_cache=self.use_cache,
+                    encode_cache=bool(args.get('encode_cache')))
+        image.progress = lambda name: emit({'event': 'track', 'name': name})
+        await self._execute(
+            image.check_data, args['cue_file'], args.get('enc_options'))
+        rename, jobs = bool(args.get('rename')), args.get('jobs')
+        seek = bool(args.get('seek'))
+        if image.uses_shnsplit(jobs, seek):
+            await aio.convert(image, rename)
+        else:
+            await self._execute(
+                image.convert, rename, jobs, seek,
+                cancelled=image.cancelled)
+        if image.cache:
+            emit({'event': 'output', 'text': image.cache.report()})
+
+    async def report(self, args, emit):
+        """
+        Report an image, its lines are sent by 'output' events.
+        """
+        def job():
+            report = Reporter(self.strict, self.use_cache)
+            report.parse(args['cue_file'], bool(args.get('hash')))
+            report.pprint(Output(emit))
+        await self._execute(job)
+
+    async def tag(self, args, emit):
+        """
+        Tag the tracks of a directory, its lines are sent by 'output'
+        events.
+        """
+        album = TagWriter(self.strict, self.use_cache)
+        await self._execute(album.prepare, args['media_type'],
+                            args['cue_file'], args.get('directory') or '')
+        await aio.tag_tracks(album, bool(args.get('rename')), False,
+                             args.get('jobs') or 4, Output(emit))
@@ -0,0 +1,105 @@
+"""
+    cuetoolkit.deps
+    ~~~~~~~~~~~~~~~
+
+    The registry of external applications used by cuetoolkit. Every
+    application is looked up in PATH lazily and only once per process,
+    commands are launched with the resolved absolute paths.
+"""
+
+
+import argparse
+import os
+import shutil
+import signal
+
+tools = ('shntool', 'flac', 'mac', 'wvunpack',
+         'oggenc', 'opusenc', 'lame', 'file')
+
+
+class Registry:
+    """
+    This can resolve external applications and remember their paths.
+    """
+    def __init__(self):
+        self.paths = dict()
+
+    def resolve(self, name):
+        """
+        Find the absolute path of the application 'name' in PATH.
+        :param name: string
+        :return: string or None
+        """
+        if name not in self.paths:
+            self.paths[name] = shutil.which(name)
+        return self.paths[name]
+
+    def locate(self, name):
+        """
+        Get the path 'name' should be launched with, the bare name is
+        returned if the application cannot be found.
+        :param name: string
+        :return: string
+        """
+        return self.resolve(name) or name
+
+    def get_version(self, name):
+        """
+        Ask the application 'name' for its version.
+        :param name: string
+        :return: string or None
+        """
+        path = self.resolve(name)
+        if path is None:
+            return None
+        from subprocess import DEVNULL, PIPE, Popen, STDOUT, TimeoutExpired
+        # mac prints its banner only when it is called without arguments
+        args = {'shntool': ['-v'], 'mac': []}.get(name, ['--version'])
+        try:
+            with Popen([path] + args, stdin=DEVNULL, stdout=PIPE,
+                       stderr=STDOUT, start_new_session=True) as p:
+                try:
+                    result = p.communicate(timeout=5)[0]
+                except TimeoutExpired:
+                    # leaving the block waits for the process, so it is
+                    # killed here with its children holding the pipe
+                    os.killpg(p.pid, signal.SIGKILL)
+                    p.communicate()
+                    return None
+        except OSError:
+            return None
+        for line in result.decode('utf-8', 'replace').splitlines():
+            if line.strip(' -'):
+                return line.strip(' -')
+        return None
+
+    def report(self):
+        """
+        Print paths and versions of all known applications.
+        :return: None
+        """
+        block = max(map(len, tools)) + 2
+        for name in tools:
+            path = self.resolve(name)
+            print('{0:<{3}}{1}  {2}'.format(
+                name,
+                path or 'not installed',
+                self.get_version(name) or '',
+                block).rstrip())
+
+
+class CheckDepsAction(argparse.Action):
+    """
+    The argparse action printing the dependencies report and exiting.
+    """
+    def __init__(self, option_strings, dest=argparse.SUPPRESS,
+                 default=argparse.SUPPRESS, help=None):
+        super().__init__(option_strings=option_strings, dest=dest,
+                         default=default, nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        registry.report()
+        parser.exit()
+
+
+registry = Registry()
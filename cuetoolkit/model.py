@@ -0,0 +1,115 @@
+"""
+    cuetoolkit.model
+    ~~~~~~~~~~~~~~~~
+
+    Disc and Track are compact immutable records of a parsed cuesheet.
+    They have no instance dictionaries, so tens of thousands of discs
+    can be kept in memory at once.
+"""
+
+
+from . import version
+from .timeline import Frames
+
+
+class Record:
+    """
+    This is an abstract class, you do not want to create its instances.
+    Subclasses list their fields in __slots__ and are read-only once
+    they are created.
+    """
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        values = dict(zip(self.__slots__, args))
+        values.update(kwargs)
+        for field in self.__slots__:
+            object.__setattr__(self, field, values.get(field))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('{} is read-only'.format(type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError('{} is read-only'.format(type(self).__name__))
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field)
+                   for field in self.__slots__)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, field) for field in self.__slots__))
+
+    def __repr__(self):
+        return '{0}({1})'.format(type(self).__name__, ', '.join(
+            '{0}={1!r}'.format(field, getattr(self, field))
+            for field in self.__slots__))
+
+
+class Track(Record):
+    """
+    A track of the disc, 'pregap' and 'start' are its indices 00 and 01
+    in CD frames or None.
+    """
+    __slots__ = ('number', 'title', 'artist', 'genre', 'date',
+                 'pregap', 'start')
+
+
+class Disc(Record):
+    """
+    A disc described by a cuesheet, 'tracks' is a tuple of Track.
+    """
+    __slots__ = ('artist', 'album', 'genre', 'disc_id', 'year', 'comment',
+                 'tracks')
+
+    @classmethod
+    def from_sheet(cls, meta, store):
+        """
+        Build the disc of a parsed cuesheet.
+        :param meta: dict of cuesheet fields, see Parser._parse
+        :param store: dict of indices, see Parser._parse
+        :return: Disc
+        """
+        def column(name, number, default=None):
+            # a track without its own value takes the disc value
+            return (meta.get(name) or dict()).get(number, default)
+
+        def frames(number, index):
+            line = store.get(number, (None, None))[index]
+            # the start of the image is not an index, as in the points store
+            if not line or (number == '01' and line == '00:00:00'):
+                return None
+            return Frames.parse(line)
+        tracks = tuple(
+            Track(number, column('title', number),
+                  column('artist', number, meta['art_a']),
+                  column('tgenre', number), column('tdate', number),
+                  frames(number, 0), frames(number, 1))
+            for number in meta['track'])
+        return cls(meta['art_a'], meta['album'], meta['genre'],
+                   meta['d_id'], meta['year'], meta['comm'], tracks)
+
+    @property
+    def total(self):
+        """
+        The number of the last track.
+        """
+        return int(self.tracks[-1].number)
+
+    @property
+    def tag_comment(self):
+        """
+        The comment written to tags of tracks.
+        """
+        return '{0}/{1}'.format(self.comment or 'cuetoolkit-' + version,
+                                self.disc_id or 'unknown disc')
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def __iter__(self):
+        return iter(self.tracks)
+
+    def __getitem__(self, step):
+        return self.tracks[step]
@@ -7,11 +7,9 @@
 """
 
 
-from mutagen import flac, id3, mp3, oggopus, oggvorbis, MutagenError
-
 from .. import version
 from ..abstract import Writer
-from ..exc import FileError
+from ..exc import FileError, ReqAppError
 
 
 class TagCollector(Writer):
@@ -28,10 +26,12 @@ class TagCollector(Writer):
         self.media_type = media_type
         self.album_type = album_type
         self.empty = empty
+        self.active_class = None
         self.cue_sheet = None
         self.ready = False
 
     def _check_id3version(self, files):
+        from mutagen import id3, MutagenError
         check = True
         for item in files:
             message = '"{}": no suitable tag'.format(item)
@@ -47,6 +47,7 @@ class TagCollector(Writer):
         return check
 
     def _choose(self):
+        from mutagen import flac, mp3, oggopus, oggvorbis
         choices = {'flac': flac.FLAC,
                    'ogg': oggvorbis.OggVorbis,
                    'opus': oggopus.OggOpus,
@@ -66,7 +67,7 @@ class TagCollector(Writer):
         tracks = self.get_numbers(files)
         for step, item in enumerate(tracks):
             try:
-                song = self._choose()(files[step])
+                song = self.active_class(files[step])
                 store[item] = song
             except OSError:
                 store[item] = {}
@@ -155,6 +156,11 @@ class TagCollector(Writer):
         :param files: list of file names
         :return: None
         """
+        # mutagen is loaded only when tags are read
+        try:
+            self.active_class = self._choose()
+        except ImportError:
+            raise ReqAppError('python3 module mutagen is not installed')
         if self.media_type == 'mp3':
             if not self._check_id3version(files) and not self.empty:
                 raise FileError(
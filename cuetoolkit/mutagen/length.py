@@ -0,0 +1,93 @@
+"""
+    cuetoolkit.mutagen.length
+    ~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Read stream parameters of FLAC and WavPack images from their headers,
+    so the image length is known without decoding it.
+"""
+
+
+import os
+import struct
+
+from mutagen import flac, MutagenError
+
+from ..abstract import Wave
+
+# WavPack sample rates by their index in block flags, 15 is a custom rate
+rates = (6000, 8000, 9600, 11025, 12000, 16000, 22050, 24000, 32000,
+         44100, 48000, 64000, 88200, 96000, 192000)
+
+
+def read_stream_info(media):
+    """
+    Read the stream header of 'media'.
+    :param media: string (file name of a FLAC or WavPack image)
+    :return: namedtuple Wave or None if the header is missing or cannot
+             be trusted
+    """
+    ext = os.path.splitext(media)[1].lower()
+    if ext == '.wv':
+        try:
+            return _read_wavpack(media)
+        except OSError:
+            return None
+    if ext != '.flac':
+        return None
+    try:
+        info = flac.FLAC(media).info
+    except (OSError, MutagenError):
+        return None
+    rate = info.sample_rate
+    bits = info.bits_per_sample
+    # 0 means the encoder did not know the amount of samples
+    samples = info.total_samples
+    if not rate or not bits or bits % 8 or not info.channels or not samples:
+        return None
+    block = info.channels * bits // 8
+    return Wave(int(info.channels), rate, bits, block, samples * block)
+
+
+def _read_wavpack(media):
+    """
+    Read the headers of the first WavPack blocks of 'media'. A block keeps
+    one or two channels, the channels of a multichannel stream are spread
+    over the blocks from an initial to a final one, so they are counted
+    here rather than by mutagen, which knows only the first block.
+    :param media: string (file name of a WavPack image)
+    :return: namedtuple Wave or None if the header is missing or cannot
+             be trusted
+    """
+    channels, first = 0, None
+    with open(media, 'rb') as f:
+        # a frame of the stream has at most 4096 channels
+        for _ in range(4096):
+            header = f.read(32)
+            if len(header) != 32 or header[:4] != b'wvpk':
+                return None
+            size, total, index, samples, flags = struct.unpack(
+                '<I4xIIII4x', header[4:])
+            # skip the rest of the block, 'size' does not count 8 bytes
+            f.seek(size - 24, os.SEEK_CUR)
+            if not samples:
+                # a block of metadata only
+                continue
+            if first is None:
+                if not flags & 0x800:
+                    return None
+                first = total, index, flags
+            channels += 1 if flags & 0x4 else 2
+            if flags & 0x1000:
+                break
+        else:
+            return None
+    total, index, flags = first
+    rate = flags >> 23 & 0xf
+    # unknown length, custom rates, floating point and DSD audio are
+    # left to shnlen
+    if total == 0xffffffff or index or rate == 15 or flags & 0x80 or \
+            flags & 0x80000000:
+        return None
+    bits = ((flags & 0x3) + 1) * 8
+    block = channels * bits // 8
+    return Wave(channels, rates[rate], bits, block, total * block)
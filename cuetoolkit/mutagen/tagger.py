@@ -1,59 +1,101 @@
-from mutagen import flac, id3, oggopus, oggvorbis, mp3, MutagenError
+import os
+
+from ..exc import ReqAppError
 
 
 class Tagger:
+    # padding reserved for later retags when a file has to be resized
+    reserve = 4096
+
     def __init__(self):
         self.active_class = None
         self.active_action = None
 
     def prepare(self, media_type):
+        # mutagen is loaded only by tools which write tags
+        try:
+            from mutagen import flac, oggopus, oggvorbis, mp3
+        except ImportError:
+            raise ReqAppError('python3 module mutagen is not installed')
         choice = {'flac': (flac.FLAC, self._write_vorbis_comment),
                   'ogg': (oggvorbis.OggVorbis, self._write_vorbis_comment),
                   'opus': (oggopus.OggOpus, self._write_vorbis_comment),
                   'mp3': (mp3.MP3, self._write_id3v2_tag)}
         self.active_class, self.active_action = choice[media_type]
 
-    def _write_vorbis_comment(self, file_name, step, obj):
+    @staticmethod
+    def _clear(song):
+        if song.tags is None:
+            song.add_tags()
+        else:
+            song.tags.clear()
+
+    def _save(self, song, file_name, head=None, **kwargs):
+        layout = dict()
+
+        def padding(info):
+            # keep the existing padding whenever the new tags fit into it
+            if info.padding >= 0:
+                layout['kept'] = info.size
+                return info.padding
+            return max(info.get_default_padding(), self.reserve)
+        song.save(file_name, padding=padding, **kwargs)
+        if 'kept' not in layout:
+            # the file was resized, everything after the tags was moved
+            return os.path.getsize(file_name)
+        if head is not None:
+            return head
+        return os.path.getsize(file_name) - layout['kept']
+
+    def _write_vorbis_comment(self, file_name, step, disc):
         song = self.active_class(file_name)
-        song.delete(file_name)
-        song['artist'] = obj.artist[step]
-        song['album'] = obj.album
-        if obj.genre and not obj.tgenre:
-            song['genre'] = obj.genre
-        elif obj.tgenre:
-            song['genre'] = obj.tgenre[step]
-        song['title'] = obj.title[step]
-        song['tracknumber'] = str(int(obj.track[step]))
-        song['tracktotal'] = str(int(obj.track[-1]))
-        if obj.year and not obj.tdate:
-            song['date'] = obj.year
-        elif obj.tdate:
-            song['date'] = obj.tdate[step]
-        song['comment'] = obj.comment
-        song.save(file_name)
-
-    def _write_id3v2_tag(self, file_name, step, obj):
+        self._clear(song)
+        track = disc[step]
+        song['artist'] = track.artist
+        song['album'] = disc.album
+        if track.genre or disc.genre:
+            song['genre'] = track.genre or disc.genre
+        song['title'] = track.title
+        song['tracknumber'] = str(int(track.number))
+        song['tracktotal'] = str(disc.total)
+        if track.date or disc.year:
+            song['date'] = track.date or disc.year
+        song['comment'] = disc.tag_comment
+        return self._save(song, file_name)
+
+    def _write_id3v2_tag(self, file_name, step, disc):
+        from mutagen import id3
         song = self.active_class(file_name)
-        song.delete()
-        song['TPE1'] = id3.TPE1(encoding=3, text=[obj.artist[step]])
-        song['TALB'] = id3.TALB(encoding=3, text=[obj.album])
-        if obj.genre and not obj.tgenre:
-            song['TCON'] = id3.TCON(encoding=3, text=[obj.genre])
-        elif obj.tgenre:
-            song['TCON'] = id3.TCON(encoding=3, text=[obj.tgenre[step]])
-        song['TIT2'] = id3.TIT2(encoding=3, text=[obj.title[step]])
-        number = '{0}/{1}'.format(int(obj.track[step]), int(obj.track[-1]))
+        self._clear(song)
+        track = disc[step]
+        song['TPE1'] = id3.TPE1(encoding=3, text=[track.artist])
+        song['TALB'] = id3.TALB(encoding=3, text=[disc.album])
+        if track.genre or disc.genre:
+            song['TCON'] = id3.TCON(
+                encoding=3, text=[track.genre or disc.genre])
+        song['TIT2'] = id3.TIT2(encoding=3, text=[track.title])
+        number = '{0}/{1}'.format(int(track.number), disc.total)
         song['TRCK'] = id3.TRCK(encoding=3, text=[number])
-        if obj.year and not obj.tdate:
-            song['TDRC'] = id3.TDRC(encoding=3, text=[obj.year])
-        elif obj.tdate:
-            song['TDRC'] = id3.TDRC(encoding=3, text=[obj.tdate[step]])
+        if track.date or disc.year:
+            song['TDRC'] = id3.TDRC(
+                encoding=3, text=[track.date or disc.year])
         song['COMM::XXX'] = id3.COMM(
-            encoding=3, lang='XXX', desc='', text=[obj.comment])
-        song.save(file_name)
+            encoding=3, lang='XXX', desc='', text=[disc.tag_comment])
+        # ID3 reports the whole file as kept, an in place tag keeps its size
+        # and v1=0 strips ID3v1 as deleting all tags did
+        return self._save(song, file_name, head=song.tags.size, v1=0)
 
-    def write_meta(self, file_name, step, obj):
+    def write_meta(self, file_name, step, disc):
+        """
+        Write metadata of track 'step' to 'file_name' with a single save.
+        :param file_name: string
+        :param step: integer
+        :param disc: instance of Disc
+        :return: the amount of rewritten bytes or None
+        """
+        from mutagen import MutagenError
         try:
-            self.active_action(file_name, step, obj)
+            return self.active_action(file_name, step, disc)
         except (OSError, MutagenError):
             print('warning:{} - metadata cannot be written'.format(file_name))
+            return None
@@ -9,16 +9,24 @@
 """
 
 
-from .abstract import Decoder, HashCounter, LengthConverter, LengthCounter
+from .abstract import Decoder, LengthConverter, StreamCounter
 from .common import Couple
 from .exc import FileError
+from .timeline import Frames, count_durations
 
 
-class Reporter(Decoder, HashCounter, LengthCounter, LengthConverter):
+class Reporter(Decoder, StreamCounter, LengthConverter):
     """
     This can extract CDDA-image data and print a report.
     """
-    def __init__(self):
+    def __init__(self, strict=False, use_cache=True):
+        """
+        :param strict: True or False, check the file type with file(1)
+        :param use_cache: True or False, look for parsed cuesheets in the
+                          cache first
+        """
+        self.strict = strict
+        self.use_cache = use_cache
         self.couple = Couple()
         self.cue = None
         self.length = None
@@ -28,15 +36,9 @@ class Reporter(Decoder, HashCounter, LengthCounter, LengthConverter):
 
     def _count_durations(self, length, points):
         if length:
-            box = list()
-            box.append(self.convert_to_number(points[0]))
-            for step, item in enumerate(points):
-                if step > 0:
-                    box.append(
-                        round(self.convert_to_number(item) -
-                              self.convert_to_number(points[step - 1]), 3))
-            box.append(round(length - self.convert_to_number(points[-1]), 3))
-            return box
+            return [Frames(each) for each in count_durations(
+                [Frames.parse(point) for point in points],
+                length.to(Frames))]
         return None
 
     def parse(self, source, media_hash=False):
@@ -49,45 +51,51 @@ class Reporter(Decoder, HashCounter, LengthCounter, LengthConverter):
         self.couple.couple(source)
         if self.couple.media:
             from .common import CDDACue
-            self.cue = CDDACue()
+            self.cue = CDDACue(self.strict, self.use_cache)
             self.cue.extract(source)
             self._check_decoder(self.couple.media)
-            self.length, self.cdda = self._count_length(self.couple.media)
+            if media_hash:
+                # a single decoding pass for the length and the hash
+                self.length, self.cdda, self.hash = self._scan_media(
+                    self.couple.media)
+            else:
+                self.length, self.cdda = self._count_length(
+                    self.couple.media)
             points = self.cue.sift_points('append')
             self.durations = self._count_durations(self.length, points)
-            last_index = self.convert_to_number(points[-1])
-            if self.length - last_index < 2:
+            last_index = Frames.parse(points[-1])
+            if self.length.to(Frames) - last_index < 2 * Frames.scale:
                 raise FileError('unsuitable media file for this cuesheet')
-            if media_hash:
-                self.hash = self.count_hash(self.couple.media)
         else:
             from .common import Cue
-            self.cue = Cue()
+            self.cue = Cue(self.strict, self.use_cache)
             self.cue.extract(source)
 
     def _form_data(self):
+        disc = self.cue.disc
         if self.durations:
             captions = ('genre:', 'year:', 'disc id:',
                         'commentary:', 'artist:', 'album:',
                         'type:', 'md5 hash:', 'cuesheet file:',
                         'media file:', 'total length:', 'tracks total:')
-            values = (self.cue.genre, self.cue.year, self.cue.d_id,
-                      self.cue.comm, self.cue.art_a, self.cue.album,
+            values = (disc.genre, disc.year, disc.disc_id,
+                      disc.comment, disc.artist, disc.album,
                       self.cdda, self.hash, self.couple.cue_base,
                       self.couple.media_base,
                       self.convert_to_string(self.length),
-                      str(int(self.cue.track[-1])))
+                      str(disc.total))
         else:
             captions = ('genre:', 'year:', 'disc_id:', 'commentary:',
                         'artist:', 'album:', 'tracks total:')
-            values = (self.cue.genre, self.cue.year, self.cue.d_id,
-                      self.cue.comm, self.cue.art_a, self.cue.album,
-                      str(int(self.cue.track[-1])))
+            values = (disc.genre, disc.year, disc.disc_id,
+                      disc.comment, disc.artist, disc.album,
+                      str(disc.total))
         return captions, values, max(map(len, captions)) + 2
 
-    def pprint(self):
+    def pprint(self, file=None):
         """
         Print the report on the screen.
+        :param file: file object to print to, sys.stdout if None
         :return: None
         """
         if self.cue is None:
@@ -98,16 +106,17 @@ class Reporter(Decoder, HashCounter, LengthCounter, LengthConverter):
                 print('{0}{1:>{2}}'.format(
                     caption,
                     value,
-                    max_length - len(caption) + len(value)))
-        mtl = max(map(len, self.cue.title)) + 2
-        mal = max(map(len, self.cue.artist)) + 2
-        for st, tr in enumerate(self.cue.track):
-            a = mal - len(self.cue.artist[st]) + len(self.cue.title[st])
+                    max_length - len(caption) + len(value)), file=file)
+        mtl = max(len(track.title) for track in self.cue.disc) + 2
+        mal = max(len(track.artist) for track in self.cue.disc) + 2
+        for st, track in enumerate(self.cue.disc):
+            a = mal - len(track.artist) + len(track.title)
             if self.durations:
                 d = self.convert_to_string(self.durations[st])
-                t = mtl - len(self.cue.title[st]) + len(d)
+                t = mtl - len(track.title) + len(d)
                 print('{0}  {1}{2:>{4}}{3:>{5}}'.format(
-                    tr, self.cue.artist[st], self.cue.title[st], d, a, t))
+                    track.number, track.artist, track.title, d, a, t),
+                    file=file)
             else:
                 print('{0}  {1}{2:>{3}}'.format(
-                    tr, self.cue.artist[st], self.cue.title[st], a))
+                    track.number, track.artist, track.title, a), file=file)
@@ -1,20 +1,39 @@
-import json
 import os
 
-from .exc import show_error
+from .exc import FileError
 
 
 conf_dir = os.path.join(os.getenv('HOME'), '.config/cuetoolkit')
 options_file = os.path.join(conf_dir, 'options')
+cache_dir = os.path.join(conf_dir, 'cache')
+track_dir = os.path.join(conf_dir, 'tracks')
+socket_file = os.path.join(conf_dir, 'socket')
 enc = {'enc': None}
 options = {codec: enc.copy() for codec in ('flac', 'ogg', 'opus', 'mp3')}
 
 
 def write_cfg(conf_file, cfg):
+    import json
     try:
         with open(conf_file, 'w', encoding='utf-8') as config:
             print(
                 json.dumps(cfg, ensure_ascii=False, sort_keys=True, indent=2),
                 file=config)
     except OSError:
-        show_error('unable to write {}'.format(conf_file))
+        raise FileError('unable to write {}'.format(conf_file))
+
+
+def init_cfg():
+    """
+    Create the directory for configuration files and the default options
+    file unless they exist, nothing is written when cuetoolkit is imported.
+    :return: None
+    """
+    if not os.path.exists(conf_dir):
+        try:
+            os.makedirs(conf_dir, mode=0o755, exist_ok=True)
+        except OSError:
+            raise FileError(
+                'unable to create the directory for configuration files')
+    if not os.path.exists(options_file):
+        write_cfg(options_file, options)
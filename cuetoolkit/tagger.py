@@ -4,11 +4,15 @@
 
     Write cuesheet metadata to a group of files of given media type.
     The only condition must be guaranteed: the amount of media files
-    in CWD must be equal to amount of tracks in cuesheet.
+    in the directory (CWD by default) must be equal to amount of tracks
+    in cuesheet.
 """
 
 
 import glob
+import os
+
+from concurrent.futures import ThreadPoolExecutor
 
 from .abstract import Rename
 from .common import Cue, Couple
@@ -20,44 +24,80 @@ class TagWriter(Rename):
     """
     This can write cuesheet metadata to a group of media files - tracks.
     """
-    def __init__(self):
-        self.cue = Cue()
+    def __init__(self, strict=False, use_cache=True):
+        """
+        :param strict: True or False, check the file type with file(1)
+        :param use_cache: True or False, look for parsed cuesheets in the
+                          cache first
+        """
+        self.cue = Cue(strict, use_cache)
         self.tagger = Tagger()
         self.couple = Couple()
+        self.directory = ''
         self.files = None
 
-    def prepare(self, media_type, source):
+    def prepare(self, media_type, source, directory=''):
         """
         Prepare data.
         :param media_type: one of these: 'flac', 'ogg', 'opus' or 'mp3'
         :param source: cuesheet file name
+        :param directory: the directory of tracks, CWD if empty
         :return: None
         """
         self.cue.extract(source)
         self.tagger.prepare(media_type)
         self.couple.couple(source)
+        self.directory = directory
+        pattern = os.path.join(
+            glob.escape(directory), '*.{0}'.format(media_type))
         self.files = [name for name in
-                      sorted(glob.glob('*.{0}'.format(media_type)))
+                      sorted(map(os.path.basename, glob.glob(pattern)))
                       if name != self.couple.media_base]
-        if len(self.cue.track) != len(self.files):
+        if len(self.cue.disc) != len(self.files):
             raise AmountError(
-                '{0} tracks in cuesheet and {1} files in CWD'
-                .format(len(self.cue.track), len(self.files)))
+                '{0} tracks in cuesheet and {1} files in {2}'
+                .format(len(self.cue.disc), len(self.files),
+                        directory or 'CWD'))
 
-    def write_metadata(self, rename, quiet):
+    def write_metadata(self, rename, quiet, jobs=4, file=None):
         """
-        Write cuesheet metadata to a group of tracks.
+        Write cuesheet metadata to a group of tracks, up to 'jobs' tracks
+        are tagged at a time, the output keeps the order of tracks.
         :param rename: True or False
         :param quiet: True or False
+        :param jobs: integer
+        :param file: file object to print to, sys.stdout if None
         :return: None
         """
-        block = max(len(name) for name in self.files) + 2
-        for step, item in enumerate(self.files):
-            self.tagger.write_meta(item, step, self.cue)
-            if rename:
-                new_name = self.rename_file(item, step, self.cue)
-                if not quiet:
-                    print('{0:<{2}}->  {1}'
-                          .format(item, new_name or 'skipped', block))
-            if not quiet and not rename:
-                print('{0:<{1}}done'.format(item, block))
+        block = self._gen_block()
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            tagged = pool.map(
+                self.tagger.write_meta,
+                [os.path.join(self.directory, name) for name in self.files],
+                range(len(self.files)),
+                [self.cue.disc] * len(self.files))
+            for step, (item, size) in enumerate(zip(self.files, tagged)):
+                self._finish_track(
+                    step, item, size, rename, quiet, block, file)
+
+    def _gen_block(self):
+        return max(len(name) for name in self.files) + 2
+
+    def _finish_track(self, step, item, size, rename, quiet, block, file):
+        # the tagged track is renamed and reported in the order of tracks
+        if size is None:
+            if not quiet:
+                print('{0:<{1}}skipped'.format(item, block), file=file)
+            return
+        if rename:
+            new_name = self.rename_file(
+                os.path.join(self.directory, item), step, self.cue.disc)
+            if new_name:
+                new_name = os.path.basename(new_name)
+            if not quiet:
+                print('{0:<{3}}->  {1}, {2} bytes rewritten'
+                      .format(item, new_name or 'not renamed', size, block),
+                      file=file)
+        elif not quiet:
+            print('{0:<{2}}done, {1} bytes rewritten'
+                  .format(item, size, block), file=file)
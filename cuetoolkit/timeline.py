@@ -0,0 +1,129 @@
+"""
+    cuetoolkit.timeline
+    ~~~~~~~~~~~~~~~~~~~
+
+    Integer time types. Cuesheets count time in CD frames (1/75 of a
+    second), so do CDDA images. Images which are not CDDA are split by
+    shnsplit at milliseconds. Keeping times as integers in their own units
+    means they never drift on the way from the cuesheet to the splitter
+    and the report.
+"""
+
+
+import operator
+import re
+
+from array import array
+
+from .exc import InvalidCueError
+
+
+class Time(int):
+    """
+    This is an abstract class, you do not want to create instances of this
+    class, use Frames or Millis.
+    """
+    scale = 1
+    width = 0
+
+    @classmethod
+    def parse(cls, time_line):
+        """
+        Convert 'time_line' in format "mm:ss.xx" or "mm:ss:xx" to time.
+        :param time_line: string
+        :return: instance of cls
+        """
+        try:
+            mm, ss, xx = (int(each) for each in re.split(r'[:.]', time_line))
+        except ValueError:
+            raise InvalidCueError('this cuesheet has an invalid timestamp')
+        if ss > 59 or xx >= cls.scale or min(mm, ss, xx) < 0:
+            raise InvalidCueError('this cuesheet has an invalid timestamp')
+        return cls((mm * 60 + ss) * cls.scale + xx)
+
+    def to(self, cls):
+        """
+        Convert time to the units of 'cls', rounding to the nearest one.
+        :param cls: Frames or Millis
+        :return: instance of cls
+        """
+        if type(self) is cls:
+            return self
+        return cls((self * cls.scale * 2 + self.scale) // (self.scale * 2))
+
+    def to_samples(self, rate):
+        """
+        Get the number of the first sample at this time.
+        :param rate: integer, the sample rate
+        :return: integer
+        """
+        return self * rate // self.scale
+
+    def to_tenths(self):
+        """
+        Get this time in tenths of a second, rounded to the nearest one.
+        :return: integer
+        """
+        return (self * 20 + self.scale) // (self.scale * 2)
+
+    @property
+    def seconds(self):
+        return self / self.scale
+
+    def format(self):
+        """
+        Format time the way shnsplit reads it.
+        :return: string in format "m:ss.xx"
+        """
+        return '{0}:{1:02d}.{2:0{3}d}'.format(
+            self // (self.scale * 60), self // self.scale % 60,
+            self % self.scale, self.width)
+
+
+class Frames(Time):
+    """
+    Time counted in CD frames.
+    """
+    scale = 75
+    width = 2
+
+    @classmethod
+    def from_bytes(cls, size):
+        """
+        Count CD frames of 'size' bytes of CD quality audio data.
+        :param size: integer
+        :return: Frames
+        """
+        return cls(size // 2352)
+
+
+class Millis(Time):
+    """
+    Time counted in milliseconds.
+    """
+    scale = 1000
+    width = 3
+
+    @classmethod
+    def from_samples(cls, samples, rate):
+        """
+        Convert an amount of samples to milliseconds, rounding to the
+        nearest one.
+        :param samples: integer
+        :param rate: integer, the sample rate
+        :return: Millis
+        """
+        return cls((samples * 2000 + rate) // (rate * 2))
+
+
+def count_durations(points, length):
+    """
+    Count durations of all tracks at once.
+    :param points: sequence of integer times, starts of tracks 2, 3...
+    :param length: integer time in the same units, the image length
+    :return: array of integers
+    """
+    marks = array('q', [0])
+    marks.extend(points)
+    marks.append(length)
+    return array('q', map(operator.sub, marks[1:], marks))
@@ -8,16 +8,19 @@ to tracks and filling tracks metadata'
 setup(
     name='cuetoolkit',
     version=version,
-    packages=find_packages(),
+    packages=find_packages(exclude=('benchmarks', 'benchmarks.*')),
     python_requires='~=3.5',
     install_requires=['mutagen>=1.36', 'chardet>=2.3.0'],
     zip_safe=False,
-    scripts=['bin/cue2report',
+    scripts=['bin/cuetoolkit',
+             'bin/cue2report',
              'bin/cue2points',
              'bin/cue2tracks',
              'bin/cue2tags',
              'bin/tags2cue',
-             'bin/cue2copy'],
+             'bin/cue2copy',
+             'bin/cuetoolkitd',
+             'bin/cuetoolkitc'],
     author='AndreyVM',
     author_email='webmaster@codej.ru',
     description=DESC,